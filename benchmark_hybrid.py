@@ -0,0 +1,146 @@
+"""Benchmark lexical, dense (LSA) and hybrid (RRF) retrieval: recall@k against latency.
+
+Indexes the domain folders under data/ as one collection and answers a set
+of queries with every ranking mode. Queries are either read from a labelled
+JSON-lines file ({"query": ..., "source": ...}; a hit is any retrieved chunk
+from that source file) or generated from the corpus: a window of words from
+a random chunk with some words dropped, whose hit is that chunk.
+
+For every mode the report lists recall@k for each k, milliseconds per query
+and the smallest k whose recall matches the lexical recall at the current
+TOP_K_RETRIEVAL, which is the k a smaller prompt could use.
+
+Usage:
+    python benchmark_hybrid.py [--ks 1,2,3,5,8,10] [--queries 300]
+                               [--query-words 8] [--drop 0.3]
+                               [--backend tfidf|bm25] [--vectorizer tfidf|hashing]
+                               [--labels queries.jsonl] [--output report.json]
+"""
+
+import argparse
+import json
+import re
+import time
+
+import numpy as np
+
+from src.config import Config
+from src.utils.document_loader import DocumentLoader
+from src.utils.vector_store import SimpleEmbeddings, SimpleVectorStore, _top_k
+
+_WORD = re.compile(r"\w+")
+
+
+def make_queries(store, count, words, drop, rng):
+    """(query, relevant row ids) pairs built from random word windows of random chunks."""
+    queries = []
+    rows = rng.permutation(len(store.documents))
+    for row in rows:
+        tokens = _WORD.findall(store.documents[row].page_content)
+        if len(tokens) < words:
+            continue
+        start = rng.integers(0, len(tokens) - words + 1)
+        window = [t for t in tokens[start:start + words] if rng.random() >= drop]
+        if window:
+            queries.append((" ".join(window), {int(row)}))
+        if len(queries) == count:
+            break
+    return queries
+
+
+def load_labels(path, store):
+    """(query, relevant row ids) pairs from a JSON-lines file of query/source labels."""
+    rows_of = {}
+    for row, chunk in enumerate(store.documents):
+        rows_of.setdefault(chunk.source_metadata.get("source"), set()).add(row)
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                label = json.loads(line)
+                queries.append((label["query"], rows_of.get(label["source"], set())))
+    return queries
+
+
+def ranking_modes(store):
+    """Score functions of every mode, each mapping a query to one score per chunk."""
+    def lexical(query):
+        return store._lexical_scores(query)
+
+    def dense(query):
+        return store._lsa.scores(store._tfidf.transform([query]))
+
+    return {store.backend: lexical, "lsa": dense, "hybrid": store._hybrid_scores}
+
+
+def evaluate(score, queries, ks):
+    hits = np.zeros(len(ks))
+    started = time.perf_counter()
+    rankings = [_top_k(score(query), max(ks)) for query, _ in queries]
+    ms_per_query = (time.perf_counter() - started) / len(queries) * 1000
+    for ranking, (_, relevant) in zip(rankings, queries):
+        for i, k in enumerate(ks):
+            hits[i] += bool(relevant.intersection(ranking[:k].tolist()))
+    recall = hits / len(queries)
+    return {f"recall_at_{k}": round(float(r), 4) for k, r in zip(ks, recall)}, ms_per_query
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lexical, dense and hybrid retrieval")
+    parser.add_argument("--ks", default="1,2,3,5,8,10", help="Comma-separated cut-offs for recall@k")
+    parser.add_argument("--queries", type=int, default=300, help="Generated queries")
+    parser.add_argument("--query-words", type=int, default=8, help="Words per generated query window")
+    parser.add_argument("--drop", type=float, default=0.3, help="Share of window words dropped")
+    parser.add_argument("--backend", default="tfidf", help="Lexical leg: tfidf or bm25")
+    parser.add_argument("--vectorizer", default="tfidf", help="tfidf or hashing")
+    parser.add_argument("--labels", help="JSON-lines file of {query, source} labels instead of generated queries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+    ks = sorted({int(k) for k in args.ks.split(",") if k.strip()} | {Config.TOP_K_RETRIEVAL})
+
+    loader = DocumentLoader(chunk_size=Config.CHUNK_SIZE, chunk_overlap=Config.CHUNK_OVERLAP)
+    directories = [Config.HR_DOCS_DIR, Config.TECH_DOCS_DIR, Config.FINANCE_DOCS_DIR]
+    chunks = [chunk for d in directories for chunk in loader.stream_chunks(d)]
+    started = time.perf_counter()
+    store = SimpleVectorStore(
+        chunks, SimpleEmbeddings(), backend=args.backend, vectorizer=args.vectorizer, hybrid=True
+    )
+    build_seconds = time.perf_counter() - started
+
+    rng = np.random.default_rng(args.seed)
+    if args.labels:
+        queries = load_labels(args.labels, store)
+    else:
+        queries = make_queries(store, args.queries, args.query_words, args.drop, rng)
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "chunks": len(store),
+        "queries": len(queries),
+        "lsa_components": int(store._lsa.components.shape[0]),
+        "build_seconds": round(build_seconds, 3),
+        "top_k_retrieval": Config.TOP_K_RETRIEVAL,
+        "modes": {},
+    }
+    for name, score in ranking_modes(store).items():
+        recall, ms_per_query = evaluate(score, queries, ks)
+        report["modes"][name] = {**recall, "ms_per_query": round(ms_per_query, 4)}
+
+    # Smallest k at which each mode is at least as good as the lexical
+    # baseline at the configured TOP_K_RETRIEVAL
+    baseline = report["modes"][args.backend][f"recall_at_{Config.TOP_K_RETRIEVAL}"]
+    for result in report["modes"].values():
+        result["k_matching_baseline"] = next(
+            (k for k in ks if result[f"recall_at_{k}"] >= baseline), None
+        )
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
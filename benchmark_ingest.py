@@ -0,0 +1,180 @@
+"""Benchmark the ingest pipeline (load -> chunk -> dedup -> fit) per stage.
+
+Runs against the domain folders under data/ and against synthetic copies
+scaled 10x/100x/1000x, and prints one JSON report with files/s, MB/s,
+chunks/s, fit time and peak traced memory for every stage.
+
+Usage:
+    python benchmark_ingest.py [--scales 1,10,100,1000] [--workers N]
+                               [--dedup] [--no-memory] [--output report.json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.config import Config
+from src.utils.dedup import MinHashDeduplicator
+from src.utils.document_loader import DocumentLoader
+from src.utils.vector_store import SimpleEmbeddings, SimpleVectorStore
+
+
+TEXT_EXTENSIONS = {".txt", ".md"}
+
+
+def make_scaled_corpus(source_dirs, scale, target):
+    """Copy every source file `scale` times into `target`.
+
+    Text copies get one header line each to keep them distinct; binary
+    files such as PDFs are copied byte for byte so they stay parseable.
+    """
+    for source_dir in source_dirs:
+        for file_path in sorted(Path(source_dir).rglob("*")):
+            if not file_path.is_file():
+                continue
+            is_text = file_path.suffix.lower() in TEXT_EXTENSIONS
+            text = file_path.read_text(encoding="utf-8", errors="ignore") if is_text else None
+            out_dir = Path(target) / Path(source_dir).name
+            out_dir.mkdir(parents=True, exist_ok=True)
+            for copy in range(scale):
+                out = out_dir / f"{file_path.stem}_{copy:05d}{file_path.suffix}"
+                if is_text:
+                    out.write_text(f"Copy {copy} of {file_path.name}\n{text}", encoding="utf-8")
+                else:
+                    shutil.copyfile(file_path, out)
+
+
+class Stage:
+    """Context manager timing one stage and recording its peak traced memory"""
+
+    def __init__(self, report, name, trace_memory):
+        self.report = report
+        self.name = name
+        self.trace_memory = trace_memory
+
+    def __enter__(self):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        entry = self.report.setdefault(self.name, {})
+        entry["seconds"] = round(seconds, 4)
+        if self.trace_memory:
+            entry["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        return False
+
+
+def run_pipeline(directories, loader, dedup, trace_memory):
+    """Run load/chunk/dedup/fit over all directories and return per-stage metrics."""
+    stages = {}
+    files = [f for d in directories for f in loader.list_files(d)]
+    total_mb = sum(f.stat().st_size for f in files) / (1024 * 1024)
+
+    with Stage(stages, "load", trace_memory):
+        documents = loader.load_files(files)
+    rate = max(stages["load"]["seconds"], 1e-9)
+    stages["load"].update({
+        "files": len(files),
+        "documents": len(documents),
+        "mb": round(total_mb, 3),
+        "files_per_second": round(len(files) / rate, 1),
+        "mb_per_second": round(total_mb / rate, 2),
+    })
+
+    with Stage(stages, "chunk", trace_memory):
+        chunks = list(loader.iter_chunks(documents))
+    rate = max(stages["chunk"]["seconds"], 1e-9)
+    stages["chunk"].update({
+        "chunks": len(chunks),
+        "chunks_per_second": round(len(chunks) / rate, 1),
+        "mb_per_second": round(total_mb / rate, 2),
+    })
+
+    if dedup:
+        deduplicator = MinHashDeduplicator(threshold=Config.DEDUP_THRESHOLD)
+        with Stage(stages, "dedup", trace_memory):
+            chunks = list(deduplicator.deduplicate(chunks))
+        rate = max(stages["dedup"]["seconds"], 1e-9)
+        stages["dedup"].update({
+            "removed": deduplicator.stats["removed"],
+            "chunks_per_second": round(deduplicator.stats["input"] / rate, 1),
+        })
+
+    with Stage(stages, "fit", trace_memory):
+        store = SimpleVectorStore(chunks, SimpleEmbeddings())
+    rate = max(stages["fit"]["seconds"], 1e-9)
+    stages["fit"].update({
+        "chunks": len(store.documents),
+        "chunks_per_second": round(len(store.documents) / rate, 1),
+        "vocabulary": len(store._tfidf.vocabulary_),
+        "matrix_nnz": int(store._matrix.nnz),
+    })
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document ingestion per stage")
+    parser.add_argument("--scales", default="1,10,100,1000",
+                        help="Comma-separated corpus multipliers (1 = data/ as is)")
+    parser.add_argument("--workers", type=int, default=Config.INGEST_WORKERS,
+                        help="Ingest worker processes (0 = sequential)")
+    parser.add_argument("--dedup", action="store_true", help="Include the MinHash dedup stage")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip tracemalloc (faster, timings closer to production)")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    source_dirs = [Config.HR_DOCS_DIR, Config.TECH_DOCS_DIR, Config.FINANCE_DOCS_DIR]
+    trace_memory = not args.no_memory
+    loader = DocumentLoader(
+        chunk_size=Config.CHUNK_SIZE,
+        chunk_overlap=Config.CHUNK_OVERLAP,
+        num_workers=args.workers,
+        mmap_threshold=Config.MMAP_THRESHOLD_BYTES
+    )
+
+    report = {
+        "config": {
+            "workers": args.workers,
+            "chunk_size": Config.CHUNK_SIZE,
+            "chunk_overlap": Config.CHUNK_OVERLAP,
+            "dedup": args.dedup,
+            "trace_memory": trace_memory,
+        },
+        "runs": [],
+    }
+    if trace_memory:
+        tracemalloc.start()
+    for scale in [int(s) for s in args.scales.split(",") if s.strip()]:
+        print(f"Benchmarking scale {scale}x...")
+        if scale == 1:
+            stages = run_pipeline(source_dirs, loader, args.dedup, trace_memory)
+        else:
+            workdir = tempfile.mkdtemp(prefix=f"ingest_bench_{scale}x_")
+            try:
+                make_scaled_corpus(source_dirs, scale, workdir)
+                directories = [os.path.join(workdir, Path(d).name) for d in source_dirs]
+                stages = run_pipeline(directories, loader, args.dedup, trace_memory)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+        report["runs"].append({"scale": scale, "stages": stages})
+    if trace_memory:
+        tracemalloc.stop()
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark approximate (IVF) against exact dense-vector retrieval.
+
+Builds an IVFIndex over synthetic clustered unit vectors at several corpus
+sizes and prints one JSON report with build time, exact-search latency and,
+for every vector quantization and nprobe setting, stored vector memory,
+recall@k against exact search and per-query latency. Quantized indexes
+rescore their shortlist against the full-precision vectors, which this
+benchmark keeps in memory next to the index: total_mb counts both
+(SimpleVectorStore instead re-projects the candidates' TF-IDF rows, so its
+quantized indexes need no float32 copy unless hybrid ranking is on).
+
+Usage:
+    python benchmark_retrieval.py [--sizes 10000,100000] [--dim 384]
+                                  [--nprobe 1,4,8,16,32] [--k 10]
+                                  [--quantization none,float16,int8]
+                                  [--queries 200] [--output report.json]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.utils.vector_store import IVFIndex, exact_search
+
+
+def make_vectors(n, dim, clusters, rng):
+    """Unit vectors drawn around `clusters` random centres (embeddings are clustered, not uniform)."""
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, n)] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def make_queries(vectors, count, rng):
+    """Perturbed copies of random corpus vectors."""
+    queries = vectors[rng.integers(0, len(vectors), count)]
+    queries = queries + 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def per_query_ms(search, queries):
+    """Mean latency of answering the queries one at a time."""
+    started = time.perf_counter()
+    for query in queries:
+        search(query)
+    return (time.perf_counter() - started) / len(queries) * 1000
+
+
+def run_size(n, args, rng):
+    vectors = make_vectors(n, args.dim, args.clusters, rng)
+    queries = make_queries(vectors, args.queries, rng)
+    truth = exact_search(vectors, queries, args.k)
+
+    result = {
+        "n": n,
+        "vectors_mb": round(vectors.nbytes / (1024 * 1024), 2),
+        "exact_ms_per_query": round(per_query_ms(lambda q: exact_search(vectors, q, args.k), queries), 4),
+        "ivf": [],
+    }
+    rescore = lambda ids: vectors[ids]
+    for quantization in args.quantization:
+        started = time.perf_counter()
+        index = IVFIndex(quantization=quantization).fit(vectors)
+        build_seconds = time.perf_counter() - started
+        # Rescoring reads the float32 vectors; unquantized indexes store them
+        rescore_bytes = vectors.nbytes if quantization != "none" else 0
+        for nprobe in args.nprobe:
+            ids, _ = index.search(queries, args.k, nprobe=nprobe, rescore=rescore)
+            recall = np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(ids.tolist(), truth.tolist())])
+            result["ivf"].append({
+                "quantization": quantization,
+                "n_lists": index.n_lists,
+                "build_seconds": round(build_seconds, 3),
+                "stored_mb": round(index.nbytes / (1024 * 1024), 2),
+                "total_mb": round((index.nbytes + rescore_bytes) / (1024 * 1024), 2),
+                "nprobe": nprobe,
+                "recall_at_k": round(float(recall), 4),
+                "ms_per_query": round(per_query_ms(
+                    lambda q: index.search(q, args.k, nprobe=nprobe, rescore=rescore), queries
+                ), 4),
+            })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IVF against exact dense retrieval")
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated corpus sizes")
+    parser.add_argument("--dim", type=int, default=384, help="Vector dimension")
+    parser.add_argument("--clusters", type=int, default=256, help="Synthetic topic clusters")
+    parser.add_argument("--nprobe", default="1,4,8,16,32", help="Comma-separated nprobe values")
+    parser.add_argument("--quantization", default="none,float16,int8",
+                        help="Comma-separated stored vector precisions")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+    args.nprobe = [int(p) for p in args.nprobe.split(",") if p.strip()]
+    args.quantization = [q.strip() for q in args.quantization.split(",") if q.strip()]
+
+    rng = np.random.default_rng(args.seed)
+    report = {"config": {k: v for k, v in vars(args).items() if k != "output"}, "runs": []}
+    for n in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        print(f"Benchmarking {n} vectors...")
+        report["runs"].append(run_size(n, args, rng))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -83,9 +83,11 @@ class BaseRAGAgent(ABC):
             input_variables=["context", "question"]
         )
     
-    def _create_chain(self) -> RetrievalQA:
-        """Create the retrieval QA chain"""
-        retriever = self.vector_store.as_retriever(
+    def _create_chain(self, vector_store: Optional["Chroma"] = None) -> RetrievalQA:
+        """Create the retrieval QA chain over a store (default: the agent's own)"""
+        if vector_store is None:
+            vector_store = self.vector_store
+        retriever = vector_store.as_retriever(
             search_kwargs={"k": Config.TOP_K_RETRIEVAL}
         )
         
@@ -100,6 +102,22 @@ class BaseRAGAgent(ABC):
         
         return chain
     
+    def swap_vector_store(self, vector_store: "Chroma") -> None:
+        """
+        Point the agent at a rebuilt vector store
+
+        The new chain is built before anything is replaced and each swap is a
+        single attribute assignment, so queries already running keep using the
+        store and chain they started with. Chroma/FAISS stores are refreshed in
+        place instead; their retrievals wait for an update to finish.
+
+        Args:
+            vector_store: Replacement vector store
+        """
+        chain = self._create_chain(vector_store)
+        self.vector_store = vector_store
+        self.chain = chain
+    
     @abstractmethod
     def answer(self, query: str) -> dict:
         """
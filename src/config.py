@@ -22,6 +22,8 @@ class Config:
     # Default to an OpenRouter-routable alias if not provided
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "openrouter/auto")
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    # Embeddings endpoint for the chroma/faiss stores (OpenRouter serves no embeddings)
+    EMBEDDING_BASE_URL = os.getenv("EMBEDDING_BASE_URL") or OPENAI_BASE_URL
     
     # Langfuse Configuration
     LANGFUSE_PUBLIC_KEY = os.getenv("LANGFUSE_PUBLIC_KEY")
@@ -29,15 +31,62 @@ class Config:
     LANGFUSE_HOST = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
     
     # Vector Store Configuration
-    VECTOR_STORE_TYPE = "chroma"  # Options: chroma, faiss
+    # "tfidf" (in-memory, snapshotted), "chroma" or "faiss" (persistent on-disk indexes)
+    VECTOR_STORE_TYPE = os.getenv("VECTOR_STORE_TYPE", "tfidf")
     CHROMA_PERSIST_DIR = "./chroma_db"
+    # One TF-IDF index over all domains; agents query domain-filtered views of it
+    UNIFIED_INDEX = os.getenv("UNIFIED_INDEX", "0") == "1"
+    UNIFIED_COLLECTION = "all_docs"
     
     # Document Processing Configuration
     CHUNK_SIZE = 1000
     CHUNK_OVERLAP = 200
+    # "chars" (CHUNK_SIZE/CHUNK_OVERLAP) or "tokens" (CHUNK_SIZE_TOKENS/CHUNK_OVERLAP_TOKENS)
+    CHUNK_UNIT = os.getenv("CHUNK_UNIT", "chars")
+    CHUNK_SIZE_TOKENS = 256
+    CHUNK_OVERLAP_TOKENS = 32
+    TOKEN_ENCODING = "cl100k_base"
+    # Text/Markdown files at least this large are memory-mapped during ingest
+    MMAP_THRESHOLD_BYTES = int(os.getenv("MMAP_THRESHOLD_BYTES", str(64 * 1024 * 1024)))
+    # Collapse near-duplicate chunks (MinHash/LSH) before indexing
+    DEDUP_CHUNKS = os.getenv("DEDUP_CHUNKS", "1") == "1"
+    DEDUP_THRESHOLD = 0.9
+    # Worker processes for document ingestion (0 = load sequentially)
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "0"))
     
     # RAG Configuration
     TOP_K_RETRIEVAL = 5
+    # "tfidf" (cosine over the TF-IDF matrix) or "bm25" (inverted index)
+    RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "tfidf")
+    # "tfidf" (fitted vocabulary, 4096-term cap) or "hashing" (feature hashing, append without refit)
+    VECTORIZER = os.getenv("VECTORIZER", "tfidf")
+    HASHING_N_FEATURES = 2 ** 20
+    # Approximate nearest-neighbour (IVF) index over LSA chunk vectors (dense_search)
+    DENSE_INDEX = os.getenv("DENSE_INDEX", "0") == "1"
+    ANN_LISTS = 0  # 0 = about sqrt(number of chunks)
+    ANN_NPROBE = int(os.getenv("ANN_NPROBE", "8"))
+    # Stored vector precision: "none" (float32), "float16" or "int8" (rescored in full precision)
+    ANN_QUANTIZATION = os.getenv("ANN_QUANTIZATION", "none")
+    # "similarity" or "mmr" (maximal marginal relevance over the MMR_FETCH_K best chunks)
+    RETRIEVAL_SEARCH_TYPE = os.getenv("RETRIEVAL_SEARCH_TYPE", "similarity")
+    MMR_FETCH_K = int(os.getenv("MMR_FETCH_K", "20"))
+    MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.5"))
+    # Merge retrieved overlapping chunks of the same file into one span
+    MERGE_ADJACENT_CHUNKS = os.getenv("MERGE_ADJACENT_CHUNKS", "0") == "1"
+    # Term-major copy of each TF-IDF matrix: faster single-query scoring, twice the index memory
+    QUERY_POSTINGS = os.getenv("QUERY_POSTINGS", "0") == "1"
+    # Hybrid retrieval: reciprocal-rank fusion of lexical scores and LSA (dense) similarities
+    HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "0") == "1"
+    LSA_COMPONENTS = 128
+    RRF_K = 60
+    # Worker processes per collection (hashed TF-IDF, scatter-gather top-k); 0 = in-process store
+    INDEX_SHARDS = int(os.getenv("INDEX_SHARDS", "0"))
+    # Retrieval result cache (LRU with expiry); 0 entries disables it
+    RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024"))
+    RETRIEVAL_CACHE_TTL_SECONDS = float(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "300"))
+    # Retrieval thread pool (async searches, hybrid legs) shared by all collections; in-flight async searches per collection
+    RETRIEVAL_THREADS = int(os.getenv("RETRIEVAL_THREADS", "4"))
+    RETRIEVAL_CONCURRENCY = int(os.getenv("RETRIEVAL_CONCURRENCY", "4"))
     TEMPERATURE = 0.0
     
     # Data Directories
@@ -46,6 +95,9 @@ class Config:
     TECH_DOCS_DIR = os.path.join(DATA_DIR, "tech_docs")
     FINANCE_DOCS_DIR = os.path.join(DATA_DIR, "finance_docs")
     
+    # Watch mode: seconds between document directory polls
+    WATCH_INTERVAL_SECONDS = float(os.getenv("WATCH_INTERVAL_SECONDS", "5"))
+    
     @classmethod
     def validate(cls):
         """Validate that required configuration is present"""
@@ -4,11 +4,14 @@ Main entry point for the multi-agent system
 
 import os
 import re
+import threading
 from typing import Dict, Optional
 
 from src.config import Config
 from src.utils.document_loader import DocumentLoader
+from src.utils.retrieval_cache import RetrievalCache
 from src.utils.vector_store import VectorStoreManager
+from src.utils.watcher import CollectionWatcher
 from src.agents.orchestrator import OrchestratorAgent
 from src.agents.hr_agent import HRAgent
 from src.agents.tech_agent import TechAgent
@@ -20,32 +23,62 @@ from src.utils.langfuse_setup import get_langfuse_manager
 class MultiAgentSystem:
     """Main multi-agent system orchestrator"""
     
-    def __init__(self, rebuild_vector_stores: bool = False):
+    def __init__(self, rebuild_vector_stores: bool = False, watch: bool = False):
         """
         Initialize the multi-agent system
         
         Args:
-            rebuild_vector_stores: Whether to rebuild vector stores from documents
+            rebuild_vector_stores: Whether to discard existing snapshots and
+                their file manifests and rebuild every collection from its
+                files; otherwise snapshots with a manifest are checked and
+                only changed, added or deleted files are re-read (a full
+                rebuild when the chunking or dedup settings changed)
+            watch: Whether to watch the document directories and hot-swap
+                rebuilt collections into the agents (see start_watching)
         """
         # Validate configuration
         Config.validate()
         
         # Initialize components
+        token_chunks = Config.CHUNK_UNIT == "tokens"
         self.document_loader = DocumentLoader(
-            chunk_size=Config.CHUNK_SIZE,
-            chunk_overlap=Config.CHUNK_OVERLAP
+            chunk_size=Config.CHUNK_SIZE_TOKENS if token_chunks else Config.CHUNK_SIZE,
+            chunk_overlap=Config.CHUNK_OVERLAP_TOKENS if token_chunks else Config.CHUNK_OVERLAP,
+            num_workers=Config.INGEST_WORKERS,
+            chunk_unit=Config.CHUNK_UNIT,
+            encoding_name=Config.TOKEN_ENCODING,
+            mmap_threshold=Config.MMAP_THRESHOLD_BYTES
         )
-        self.vector_store_manager = VectorStoreManager()
+        self.retrieval_cache = (
+            RetrievalCache(Config.RETRIEVAL_CACHE_SIZE, Config.RETRIEVAL_CACHE_TTL_SECONDS)
+            if Config.RETRIEVAL_CACHE_SIZE > 0 else None
+        )
+        self.vector_store_manager = VectorStoreManager(
+            dedup_threshold=Config.DEDUP_THRESHOLD if Config.DEDUP_CHUNKS else None,
+            retriever_backend=Config.RETRIEVER_BACKEND,
+            vectorizer=Config.VECTORIZER,
+            dense_index=Config.DENSE_INDEX,
+            vector_store_type=Config.VECTOR_STORE_TYPE,
+            cache=self.retrieval_cache,
+            hybrid=Config.HYBRID_RETRIEVAL,
+            shards=Config.INDEX_SHARDS
+        )
+        
+        # One index for all domains (agents get domain-filtered views of it)
+        self.unified_index = Config.UNIFIED_INDEX
+        if self.unified_index and (Config.VECTOR_STORE_TYPE != "tfidf" or Config.INDEX_SHARDS > 1):
+            print("Warning: UNIFIED_INDEX requires an unsharded tfidf store; using per-domain collections")
+            self.unified_index = False
         
         # Load or create vector stores
         self._setup_vector_stores(rebuild=rebuild_vector_stores)
         
         # Initialize specialized agents
-        hr_vector_store = self.vector_store_manager.get_vector_store("hr_docs")
-        tech_vector_store = self.vector_store_manager.get_vector_store("tech_docs")
-        finance_vector_store = self.vector_store_manager.get_vector_store("finance_docs")
+        hr_vector_store = self._collection_store("hr_docs")
+        tech_vector_store = self._collection_store("tech_docs")
+        finance_vector_store = self._collection_store("finance_docs")
         
-        if not hr_vector_store or not tech_vector_store or not finance_vector_store:
+        if hr_vector_store is None or tech_vector_store is None or finance_vector_store is None:
             raise ValueError("Vector stores not properly initialized")
         
         self.hr_agent = HRAgent(hr_vector_store)
@@ -61,22 +94,91 @@ class MultiAgentSystem:
         
         # Initialize evaluator (automatic evaluation enabled)
         self.evaluator = EvaluatorAgent()
+        
+        # Optional background watcher for document changes
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[CollectionWatcher] = None
+        if watch:
+            self.start_watching()
     
-    def _setup_vector_stores(self, rebuild: bool = False):
-        """Setup vector stores for each domain"""
-        collections = {
+    @property
+    def collection_dirs(self) -> Dict[str, str]:
+        """Source directory of each collection"""
+        return {
             "hr_docs": Config.HR_DOCS_DIR,
             "tech_docs": Config.TECH_DOCS_DIR,
             "finance_docs": Config.FINANCE_DOCS_DIR
         }
-        
-        for collection_name, docs_dir in collections.items():
+    
+    def _unified_store(self):
+        if not self.unified_index:
+            return None
+        return self.vector_store_manager.get_vector_store(Config.UNIFIED_COLLECTION)
+    
+    def _collection_store(self, collection_name: str):
+        """Store an agent retrieves from: its own collection or a view of the unified index"""
+        unified = self._unified_store()
+        if unified is not None:
+            return unified.view([collection_name])
+        return self.vector_store_manager.get_vector_store(collection_name)
+    
+    def _load_unchecked(self, collection_name: str, has_sources: bool) -> bool:
+        """
+        Load a snapshot that cannot be checked against its source files
+
+        Snapshots with a file manifest are left registered for
+        refresh_vector_store, which re-reads only files changed since the
+        snapshot (unchanged files cost one stat each).
+
+        Returns:
+            True when the loaded store is served as is
+        """
+        vector_store = self.vector_store_manager.load_vector_store(collection_name)
+        if vector_store is None:
+            return False
+        if vector_store.manifest is not None and has_sources:
+            print(f"Checking existing vector store for changes: {collection_name}")
+            return False
+        print(f"Loaded existing vector store: {collection_name}")
+        return True
+    
+    def _setup_unified_store(self, rebuild: bool = False):
+        """Setup one index over all domain directories"""
+        name = Config.UNIFIED_COLLECTION
+        directories = {
+            collection_name: docs_dir
+            for collection_name, docs_dir in self.collection_dirs.items()
+            if os.path.exists(docs_dir)
+        }
+        if not rebuild and self._load_unchecked(name, bool(directories)):
+            return
+        for collection_name, docs_dir in self.collection_dirs.items():
+            if collection_name not in directories:
+                print(f"Warning: Directory {docs_dir} does not exist. {collection_name} will be empty.")
+        if not directories:
+            from langchain.schema import Document
+            empty_docs = [Document(page_content="No documents available", metadata={})]
+            self.vector_store_manager.create_vector_store(documents=empty_docs, collection_name=name)
+            return
+        print(f"Loading documents from {', '.join(directories.values())}...")
+        vector_store = self.vector_store_manager.refresh_vector_store(
+            collection_name=name,
+            directory_path=directories,
+            document_loader=self.document_loader,
+            rebuild=rebuild
+        )
+        counts = ", ".join(f"{d}: {len(vector_store.view([d]))}" for d in directories)
+        print(f"Vector store ready: {name} with {len(vector_store)} chunks ({counts})")
+    
+    def _setup_vector_stores(self, rebuild: bool = False):
+        """Setup vector stores for each domain"""
+        if self.unified_index:
+            self._setup_unified_store(rebuild=rebuild)
+            return
+        for collection_name, docs_dir in self.collection_dirs.items():
             # Try to load existing vector store
-            if not rebuild:
-                vector_store = self.vector_store_manager.load_vector_store(collection_name)
-                if vector_store:
-                    print(f"Loaded existing vector store: {collection_name}")
-                    continue
+            if not rebuild and self._load_unchecked(collection_name, os.path.exists(docs_dir)):
+                continue
             
             # Create new vector store from documents
             if not os.path.exists(docs_dir):
@@ -89,17 +191,85 @@ class MultiAgentSystem:
                     collection_name=collection_name
                 )
             else:
+                # Incremental when a snapshot with a file manifest and the same
+                # chunking settings exists, full build otherwise
                 print(f"Loading documents from {docs_dir}...")
-                documents = self.document_loader.load_and_chunk(docs_dir)
+                vector_store = self.vector_store_manager.refresh_vector_store(
+                    collection_name=collection_name,
+                    directory_path=docs_dir,
+                    document_loader=self.document_loader,
+                    rebuild=rebuild
+                )
+                chunk_count = len(vector_store)
                 
-                if len(documents) < 50:
-                    print(f"Warning: Only {len(documents)} chunks found for {collection_name}. Minimum 50 recommended.")
+                if chunk_count < 50:
+                    print(f"Warning: Only {chunk_count} chunks found for {collection_name}. Minimum 50 recommended.")
                 
-                vector_store = self.vector_store_manager.create_vector_store(
-                    documents=documents,
-                    collection_name=collection_name
+                print(f"Vector store ready: {collection_name} with {chunk_count} chunks")
+    
+    def start_watching(self, interval: Optional[float] = None):
+        """
+        Start watching the document directories in a background thread
+        
+        When a collection's files change, only that collection is refreshed
+        (incrementally) and swapped into its agent; queries keep being served
+        from the previous store until the swap.
+        
+        Args:
+            interval: Polling interval in seconds (defaults to Config.WATCH_INTERVAL_SECONDS)
+        """
+        if self._watcher is None:
+            self._watcher = CollectionWatcher(
+                directories={
+                    name: path for name, path in self.collection_dirs.items() if os.path.exists(path)
+                },
+                on_change=self.reload_collection,
+                interval=interval or Config.WATCH_INTERVAL_SECONDS
+            )
+        self._watcher.start()
+        print(f"Watching document directories every {self._watcher.interval}s")
+    
+    def stop_watching(self):
+        """Stop the background directory watcher"""
+        if self._watcher is not None:
+            self._watcher.stop()
+    
+    def reload_collection(self, collection_name: str):
+        """
+        Rebuild one collection from disk and hot-swap it into its agent
+        
+        Args:
+            collection_name: One of the keys of collection_dirs
+        """
+        agents = {
+            "hr_docs": self.hr_agent,
+            "tech_docs": self.tech_agent,
+            "finance_docs": self.finance_agent
+        }
+        with self._reload_lock:
+            if self.unified_index:
+                # Any domain change refreshes the shared index; every agent
+                # gets a view of the new one
+                print(f"Reloading {Config.UNIFIED_COLLECTION} after a change in {collection_name}...")
+                vector_store = self.vector_store_manager.refresh_vector_store(
+                    collection_name=Config.UNIFIED_COLLECTION,
+                    directory_path={
+                        name: path for name, path in self.collection_dirs.items() if os.path.exists(path)
+                    },
+                    document_loader=self.document_loader
                 )
-                print(f"Created vector store: {collection_name} with {len(documents)} chunks")
+                for name, agent in agents.items():
+                    agent.swap_vector_store(vector_store.view([name]))
+                print(f"Swapped in {Config.UNIFIED_COLLECTION} with {len(vector_store)} chunks")
+                return
+            print(f"Reloading collection {collection_name}...")
+            vector_store = self.vector_store_manager.refresh_vector_store(
+                collection_name=collection_name,
+                directory_path=self.collection_dirs[collection_name],
+                document_loader=self.document_loader
+            )
+            agents[collection_name].swap_vector_store(vector_store)
+            print(f"Swapped in {collection_name} with {len(vector_store)} chunks")
     
     def process_query(
         self,
@@ -228,6 +398,8 @@ class MultiAgentSystem:
                 "evaluator": "EvaluatorAgent"
             },
             "vector_stores": list(self.vector_store_manager.vector_stores.keys()),
+            "unified_index": self.unified_index,
+            "retrieval_cache": self.retrieval_cache.stats if self.retrieval_cache is not None else None,
             "config": {
                 "model": Config.OPENAI_MODEL,
                 "embedding_model": Config.EMBEDDING_MODEL,
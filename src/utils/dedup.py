@@ -0,0 +1,128 @@
+"""Near-duplicate chunk elimination with MinHash signatures and LSH banding.
+
+Chunks are compared on word shingles. Each chunk gets a MinHash signature
+(computed with NumPy over all shingle hashes at once); LSH banding limits the
+comparisons to chunks that share at least one band. A chunk whose estimated
+Jaccard similarity to an already kept chunk reaches the threshold is dropped
+and recorded in the kept chunk's ``duplicates`` provenance list.
+
+Chunks are only compared within their ``domain`` (unified indexes tag every
+chunk with the collection it belongs to), so a chunk is never dropped in
+favour of a copy that another domain's agent cannot retrieve.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.document_loader import TextChunk
+
+_WORD = re.compile(r"\w+")
+# Prime just above 2**32 so hashed shingles (uint32) stay below it
+_MERSENNE_PRIME = np.uint64(4294967311)
+
+
+class MinHashDeduplicator:
+    """Streaming near-duplicate filter for TextChunk objects"""
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        """
+        Args:
+            threshold: Minimum estimated Jaccard similarity to collapse two chunks
+            num_perm: Number of MinHash permutations (signature length)
+            bands: Number of LSH bands; must divide num_perm
+            shingle_size: Words per shingle
+            seed: Seed for the permutation coefficients
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # a < 2**31 keeps a * hash (< 2**32) inside uint64
+        self._a = rng.integers(1, 2**31, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 2**31, size=(num_perm, 1), dtype=np.uint64)
+        # (domain, band, band hash) -> ids of kept chunks
+        self._buckets: Dict[Tuple[Optional[str], int, bytes], List[int]] = defaultdict(list)
+        self._signatures: List[np.ndarray] = []
+        self._kept: List[TextChunk] = []
+        self.stats = {"input": 0, "kept": 0, "removed": 0}
+
+    def _signature(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        if len(words) > self.shingle_size:
+            shingles = {
+                " ".join(words[i:i + self.shingle_size])
+                for i in range(len(words) - self.shingle_size + 1)
+            }
+        else:
+            shingles = {" ".join(words)}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        return ((self._a * hashes + self._b) % _MERSENNE_PRIME).min(axis=1)
+
+    def _band_keys(self, chunk: TextChunk, signature: np.ndarray) -> List[Tuple[Optional[str], int, bytes]]:
+        domain = chunk.source_metadata.get("domain")
+        return [
+            (domain, band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _add(self, chunk: TextChunk, signature: np.ndarray) -> None:
+        idx = len(self._kept)
+        self._kept.append(chunk)
+        self._signatures.append(signature)
+        for key in self._band_keys(chunk, signature):
+            self._buckets[key].append(idx)
+
+    def index(self, chunks: Iterable[TextChunk]) -> None:
+        """Register already indexed chunks so new chunks are compared against them."""
+        for chunk in chunks:
+            self._add(chunk, self._signature(chunk.page_content))
+
+    def deduplicate(self, chunks: Iterable[TextChunk]) -> Iterator[TextChunk]:
+        """
+        Yield chunks that are not near-duplicates of an earlier chunk
+
+        Args:
+            chunks: Chunks in ingestion order (the first occurrence within a
+                domain is kept)
+
+        Yields:
+            Kept chunks; provenance of dropped chunks is appended to the kept
+            chunk's ``duplicates`` list
+        """
+        for chunk in chunks:
+            self.stats["input"] += 1
+            signature = self._signature(chunk.page_content)
+            candidates = {
+                idx for key in self._band_keys(chunk, signature) for idx in self._buckets.get(key, ())
+            }
+            match = None
+            if candidates:
+                ids = sorted(candidates)
+                similarity = (np.stack([self._signatures[i] for i in ids]) == signature).mean(axis=1)
+                best = int(similarity.argmax())
+                if similarity[best] >= self.threshold:
+                    match = self._kept[ids[best]]
+            if match is not None:
+                match.add_duplicate(chunk)
+                self.stats["removed"] += 1
+                continue
+            self._add(chunk, signature)
+            self.stats["kept"] += 1
+            yield chunk
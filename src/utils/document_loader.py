@@ -6,8 +6,19 @@ avoid installation conflicts (numpy<2 constraint) while still producing
 `langchain.schema.Document` objects for downstream vector store usage.
 """
 
+import hashlib
+import mmap
+import os
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import List
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 from langchain.schema import Document
 from math import ceil
 
@@ -16,14 +27,303 @@ try:
 except Exception:  # pragma: no cover
     PdfReader = None
 
+try:
+    import tiktoken  # token counting for chunk_unit="tokens"
+except Exception:  # pragma: no cover
+    tiktoken = None
+
+SUPPORTED_EXTENSIONS = {".txt", ".md", ".pdf"}
+
+_NON_SPACE = re.compile(r"\S")
+_NON_SPACE_BYTES = re.compile(rb"\S")
+# Token-mode segments end after a run of newlines or after sentence punctuation
+_SEGMENT_BREAK = re.compile(r"(?<=[.!?])[ \t]+|\n+")
+_MARKDOWN_HEADING = re.compile(r"#{1,6}\s")
+# Rough characters-per-token ratio used when falling back to character chunks
+_CHARS_PER_TOKEN = 4
+# Positional reads; platforms without pread seek under a lock instead
+_HAS_PREAD = hasattr(os, "pread")
+_SEEK_LOCK = threading.Lock()
+
+
+class StaleTextError(OSError):
+    """A file behind indexed chunks changed after it was read."""
+
+
+def _utf8_start(buffer: mmap.mmap, offset: int) -> int:
+    """Move an offset forward past UTF-8 continuation bytes."""
+    while offset < len(buffer) and buffer[offset] & 0xC0 == 0x80:
+        offset += 1
+    return offset
+
+
+def _utf8_end(buffer: mmap.mmap, offset: int) -> int:
+    """Move an offset back so it does not split a UTF-8 sequence."""
+    while 0 < offset < len(buffer) and buffer[offset] & 0xC0 == 0x80:
+        offset -= 1
+    return offset
+
+
+class MappedText:
+    """
+    UTF-8 text file read by byte offsets
+
+    Slicing reads and decodes only the requested byte span from a held file
+    descriptor, so large files never exist as one Python string. Chunking
+    scans the file through a short-lived read-only memory map (see
+    ``mapped``); indexed chunks never read through a mapping, so a file that
+    is truncated or rewritten while the index is serving raises
+    StaleTextError instead of killing the process with SIGBUS. Pickles as
+    its path and expected size and mtime (reopened on load), so it can cross
+    process-pool boundaries.
+    """
+
+    __slots__ = ("path", "size", "mtime_ns", "_fd", "__weakref__")
+
+    def __init__(self, path: str, size: Optional[int] = None, mtime_ns: Optional[int] = None):
+        """
+        Args:
+            path: File path
+            size: Size the file had when it was indexed (default: current)
+            mtime_ns: Modification time the file had when it was indexed
+                (default: current). When size and mtime are given, a file
+                that no longer matches them, or no longer opens, is stale:
+                every read raises StaleTextError
+        """
+        self.path = str(path)
+        try:
+            self._fd: Optional[int] = os.open(self.path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        except OSError:
+            if size is None or mtime_ns is None:
+                raise
+            self._fd = None
+        else:
+            weakref.finalize(self, os.close, self._fd)
+        if size is None or mtime_ns is None:
+            stat = os.fstat(self._fd)
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def stale(self) -> bool:
+        """Whether the file no longer matches the size and mtime it was indexed with."""
+        if self._fd is None:
+            return True
+        stat = os.fstat(self._fd)
+        return (stat.st_size, stat.st_mtime_ns) != (self.size, self.mtime_ns)
+
+    def _check(self) -> None:
+        if self.stale:
+            raise StaleTextError(f"{self.path} changed after it was indexed")
+
+    def _read(self, start: int, length: int) -> bytes:
+        parts = []
+        while length > 0:
+            if _HAS_PREAD:
+                data = os.pread(self._fd, length, start)
+            else:
+                with _SEEK_LOCK:
+                    os.lseek(self._fd, start, os.SEEK_SET)
+                    data = os.read(self._fd, length)
+            if not data:
+                raise StaleTextError(f"{self.path} is shorter than when it was indexed")
+            parts.append(data)
+            start += len(data)
+            length -= len(data)
+        return b"".join(parts)
+
+    def __getitem__(self, key: slice) -> str:
+        start, stop, _ = key.indices(self.size)
+        self._check()
+        return self._read(start, max(0, stop - start)).decode("utf-8", errors="ignore")
+
+    def __str__(self) -> str:
+        return self[:]
+
+    def __reduce__(self):
+        return (MappedText, (self.path, self.size, self.mtime_ns))
+
+    @contextmanager
+    def mapped(self) -> Iterator[mmap.mmap]:
+        """Read-only memory map of the file for one scan (unmapped on exit)."""
+        self._check()
+        with mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+class MappedDocument:
+    """Document-like wrapper for a memory-mapped file (``page_content`` decodes everything)."""
+
+    __slots__ = ("text", "metadata")
+
+    def __init__(self, text: MappedText, metadata: Dict):
+        self.text = text
+        self.metadata = metadata
+
+    @property
+    def page_content(self) -> str:
+        return str(self.text)
+
+
+class TextChunk:
+    """
+    A chunk stored as offsets into its source document's text
+
+    All chunks of a file share the file's text and base metadata dict; the
+    chunk text and full metadata are only built when requested (for example
+    when a retrieved chunk is turned into a ``Document`` for the prompt).
+    For memory-mapped files ``text`` is a :class:`MappedText` and the offsets
+    are byte offsets (``offset_unit`` is "bytes" in the metadata).
+    """
+
+    __slots__ = ("text", "source_metadata", "chunk_start", "chunk_end", "duplicates")
+
+    def __init__(
+        self,
+        text: str,
+        source_metadata: Dict,
+        chunk_start: Optional[int] = None,
+        chunk_end: Optional[int] = None
+    ):
+        """
+        Args:
+            text: Full text of the source document (shared, not copied),
+                or the MappedText of a memory-mapped file
+            source_metadata: Metadata of the source document (shared, not copied)
+            chunk_start: Start offset, or None when the chunk is the whole text
+            chunk_end: End offset, or None when the chunk is the whole text
+        """
+        self.text = text
+        self.source_metadata = source_metadata
+        self.chunk_start = chunk_start
+        self.chunk_end = chunk_end
+        # Provenance of near-duplicate chunks collapsed into this one
+        self.duplicates: Optional[List[Dict]] = None
+
+    def copy(self) -> "TextChunk":
+        """Copy sharing the text and metadata but owning its duplicates list."""
+        chunk = TextChunk(self.text, self.source_metadata, self.chunk_start, self.chunk_end)
+        if self.duplicates:
+            chunk.duplicates = list(self.duplicates)
+        return chunk
+
+    def add_duplicate(self, other: "TextChunk") -> None:
+        """Record a collapsed near-duplicate chunk (source and offsets only)."""
+        entry = {"source": other.source_metadata.get("source")}
+        for key in ("page",):
+            if key in other.source_metadata:
+                entry[key] = other.source_metadata[key]
+        if other.chunk_start is not None:
+            entry.update({"chunk_start": other.chunk_start, "chunk_end": other.chunk_end})
+        if self.duplicates is None:
+            self.duplicates = []
+        self.duplicates.append(entry)
+        if other.duplicates:
+            self.duplicates.extend(other.duplicates)
+
+    @property
+    def page_content(self) -> str:
+        if self.chunk_start is None:
+            return self.text
+        return self.text[self.chunk_start:self.chunk_end]
+
+    @property
+    def metadata(self) -> Dict:
+        meta = dict(self.source_metadata)
+        if self.chunk_start is not None:
+            meta.update({"chunk_start": self.chunk_start, "chunk_end": self.chunk_end})
+        if self.duplicates:
+            meta["duplicates"] = list(self.duplicates)
+        return meta
+
+    def to_document(self) -> Document:
+        """Materialize the chunk as a standalone ``Document``."""
+        return Document(page_content=self.page_content, metadata=self.metadata)
+
+
+def _file_sha256(file_path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_task(
+    task: Tuple[str, Optional[Tuple[int, int]]],
+    mmap_threshold: Optional[int] = None
+) -> List[Document]:
+    """Process-pool entry point: load one file or one page range of a PDF."""
+    path, pages = task
+    return DocumentLoader(mmap_threshold=mmap_threshold).load_file(Path(path), pages=pages)
+
 
 class DocumentLoader:
     """Utility class for loading and chunking documents (txt, md, pdf)."""
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        num_workers: int = 0,
+        pdf_pages_per_task: int = 20,
+        chunk_unit: str = "chars",
+        encoding_name: str = "cl100k_base",
+        mmap_threshold: Optional[int] = None
+    ):
+        """
+        Args:
+            chunk_size: Chunk size in ``chunk_unit`` units
+            chunk_overlap: Overlap between consecutive chunks in ``chunk_unit`` units
+            num_workers: Worker processes for file loading (0 or 1 loads
+                sequentially in this process)
+            pdf_pages_per_task: PDFs with more pages are split into page
+                ranges of this size so one large file can use several workers
+            chunk_unit: "chars" for a fixed character window, or "tokens" to
+                pack whole sentences/lines up to a tiktoken token budget,
+                starting a new chunk at Markdown headings
+            encoding_name: tiktoken encoding used when chunk_unit="tokens"
+            mmap_threshold: Text/Markdown files of at least this many bytes
+                are memory-mapped and chunked on byte offsets instead of
+                being read into a string (None disables)
+        """
+        if chunk_unit not in {"chars", "tokens"}:
+            raise ValueError(f"Unsupported chunk_unit: {chunk_unit}")
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-    
+        self.num_workers = num_workers
+        self.pdf_pages_per_task = max(1, pdf_pages_per_task)
+        self.chunk_unit = chunk_unit
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self.mmap_threshold = mmap_threshold
+        self.last_ingest_stats: Dict[str, float] = {}
+
+    @property
+    def chunking_params(self) -> Dict[str, Any]:
+        """
+        Settings that decide which chunks a file is split into
+
+        Indexes store them next to their file manifest: chunks built with
+        other settings cannot be patched file by file and need a full build.
+        """
+        # Resolve a tokens -> chars fallback first, so the settings recorded
+        # before and after the first chunking pass are the same
+        self._get_encoding()
+        params: Dict[str, Any] = {
+            "chunk_unit": self.chunk_unit,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "mmap_threshold": self.mmap_threshold,
+        }
+        if self.chunk_unit == "tokens":
+            params["encoding_name"] = self.encoding_name
+        return params
+
     def load_directory(self, directory_path: str) -> List[Document]:
         """
         Load all documents from a directory
@@ -34,70 +334,374 @@ class DocumentLoader:
         Returns:
             List of Document objects
         """
-        documents: List[Document] = []
-        directory = Path(directory_path)
+        return list(self.iter_directory(directory_path))
+
+    def list_files(self, directory_path: str) -> List[Path]:
+        """Return the supported files under a directory in a stable (sorted) order."""
+        return sorted(
+            file_path for file_path in Path(directory_path).rglob("*")
+            if file_path.is_file() and file_path.suffix.lower() in SUPPORTED_EXTENSIONS
+        )
+
+    def load_files(self, file_paths: List[Path]) -> List[Document]:
+        """
+        Load several files, in a process pool when ``num_workers > 1``
+
+        Args:
+            file_paths: Files to load
+
+        Returns:
+            List of Document objects in the order of ``file_paths``
+        """
+        return list(self.iter_files(file_paths))
+
+    def iter_files(self, file_paths: List[Path]) -> Iterator[Document]:
+        """
+        Lazily load several files, in a process pool when ``num_workers > 1``
 
-        if not directory.exists():
+        Documents are yielded in the order of ``file_paths`` (and page order
+        within PDFs) regardless of which worker finished first. At most
+        ``num_workers * 4`` pool tasks are in flight, so a slow consumer keeps
+        memory bounded. Throughput is printed and kept in
+        ``last_ingest_stats`` once the iterator is exhausted.
+
+        Args:
+            file_paths: Files to load
+
+        Yields:
+            Document objects
+        """
+        started = time.perf_counter()
+        total_bytes = sum(p.stat().st_size for p in file_paths)
+        count = 0
+        if self.num_workers > 1 and len(file_paths) > 1:
+            tasks = iter(self._plan_tasks(file_paths))
+            with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
+                pending: Deque = deque(
+                    pool.submit(_load_task, task, self.mmap_threshold)
+                    for task in islice(tasks, self.num_workers * 4)
+                )
+                while pending:
+                    docs = pending.popleft().result()
+                    for task in islice(tasks, 1):
+                        pending.append(pool.submit(_load_task, task, self.mmap_threshold))
+                    count += len(docs)
+                    yield from docs
+        else:
+            for file_path in file_paths:
+                docs = self.load_file(file_path)
+                count += len(docs)
+                yield from docs
+
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        self.last_ingest_stats = {
+            "files": len(file_paths),
+            "documents": count,
+            "bytes": total_bytes,
+            "seconds": elapsed,
+            "files_per_second": len(file_paths) / elapsed,
+            "mb_per_second": total_bytes / (1024 * 1024) / elapsed,
+            "workers": max(1, self.num_workers),
+        }
+        if file_paths:
+            print(
+                f"Ingested {len(file_paths)} files ({total_bytes / (1024 * 1024):.2f} MB) in {elapsed:.2f}s "
+                f"with {max(1, self.num_workers)} worker(s): "
+                f"{self.last_ingest_stats['files_per_second']:.1f} files/s, "
+                f"{self.last_ingest_stats['mb_per_second']:.2f} MB/s"
+            )
+
+    def iter_directory(self, directory_path: str) -> Iterator[Document]:
+        """Lazily load all documents from a directory (see :meth:`iter_files`)."""
+        if not Path(directory_path).exists():
             raise ValueError(f"Directory {directory_path} does not exist")
+        return self.iter_files(self.list_files(directory_path))
 
-        supported = {".txt", ".md", ".pdf"}
+    def _plan_tasks(self, file_paths: List[Path]) -> List[Tuple[str, Optional[Tuple[int, int]]]]:
+        """Split files (and large PDFs into page ranges) into pool tasks."""
+        tasks: List[Tuple[str, Optional[Tuple[int, int]]]] = []
+        for file_path in file_paths:
+            page_count = 0
+            if file_path.suffix.lower() == ".pdf" and PdfReader:
+                try:
+                    page_count = len(PdfReader(str(file_path)).pages)
+                except Exception:  # pragma: no cover - reported again by the worker
+                    page_count = 0
+            if page_count > self.pdf_pages_per_task:
+                for start in range(0, page_count, self.pdf_pages_per_task):
+                    tasks.append((str(file_path), (start, min(start + self.pdf_pages_per_task, page_count))))
+            else:
+                tasks.append((str(file_path), None))
+        return tasks
 
-        for file_path in directory.rglob("*"):
-            if not file_path.is_file() or file_path.suffix.lower() not in supported:
-                continue
-            try:
-                suffix = file_path.suffix.lower()
-                if suffix in {".txt", ".md"}:
-                    text = file_path.read_text(encoding="utf-8", errors="ignore")
-                    documents.append(
-                        Document(page_content=text, metadata={"source": str(file_path)})
+    def load_file(self, file_path: Path, pages: Optional[Tuple[int, int]] = None) -> List[Document]:
+        """
+        Load a single file (one Document per text file, one per PDF page)
+
+        Args:
+            file_path: Path to a supported file
+            pages: Optional ``(start, stop)`` zero-based page range for PDFs
+
+        Returns:
+            List of Document objects (empty if the file could not be read)
+        """
+        documents: List[Document] = []
+        try:
+            suffix = file_path.suffix.lower()
+            if suffix in {".txt", ".md"} and self._should_map(file_path):
+                documents.append(
+                    MappedDocument(
+                        MappedText(str(file_path)),
+                        metadata={"source": str(file_path), "offset_unit": "bytes"},
                     )
-                elif suffix == ".pdf":
-                    if not PdfReader:
-                        print(f"pypdf not available, skipping PDF {file_path}")
-                        continue
-                    reader = PdfReader(str(file_path))
-                    for page_index, page in enumerate(reader.pages):
-                        page_text = page.extract_text() or ""
-                        documents.append(
-                            Document(
-                                page_content=page_text,
-                                metadata={
-                                    "source": str(file_path),
-                                    "page": page_index + 1,
-                                    "total_pages": len(reader.pages),
-                                },
-                            )
+                )
+            elif suffix in {".txt", ".md"}:
+                text = file_path.read_text(encoding="utf-8", errors="ignore")
+                documents.append(
+                    Document(page_content=text, metadata={"source": str(file_path)})
+                )
+            elif suffix == ".pdf":
+                if not PdfReader:
+                    print(f"pypdf not available, skipping PDF {file_path}")
+                    return documents
+                reader = PdfReader(str(file_path))
+                total_pages = len(reader.pages)
+                start, stop = pages or (0, total_pages)
+                for page_index in range(start, min(stop, total_pages)):
+                    page_text = reader.pages[page_index].extract_text() or ""
+                    documents.append(
+                        Document(
+                            page_content=page_text,
+                            metadata={
+                                "source": str(file_path),
+                                "page": page_index + 1,
+                                "total_pages": total_pages,
+                            },
                         )
-            except Exception as e:  # pragma: no cover
-                print(f"Error loading {file_path}: {e}")
+                    )
+        except Exception as e:  # pragma: no cover
+            print(f"Error loading {file_path}: {e}")
+        return documents
+
+    def build_manifest(
+        self,
+        directory_path: str,
+        previous: Optional[Dict[str, Dict]] = None
+    ) -> Dict[str, Dict]:
+        """
+        Fingerprint every supported file under a directory
+
+        Content hashes are only recomputed for files whose size or mtime
+        differs from the previous manifest entry.
+
+        Args:
+            directory_path: Path to directory containing documents
+            previous: Manifest from an earlier build, keyed by source path
+
+        Returns:
+            Manifest mapping source path to ``{"sha256", "size", "mtime"}``
+        """
+        previous = previous or {}
+        manifest: Dict[str, Dict] = {}
+        for file_path in self.list_files(directory_path):
+            stat = file_path.stat()
+            source = str(file_path)
+            entry = previous.get(source)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                manifest[source] = entry
                 continue
+            manifest[source] = {
+                "sha256": _file_sha256(file_path),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+            }
+        return manifest
+
+    @staticmethod
+    def diff_manifest(
+        previous: Dict[str, Dict],
+        current: Dict[str, Dict]
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Compare two manifests
+
+        Args:
+            previous: Manifest the existing index was built from
+            current: Freshly built manifest
+
+        Returns:
+            Tuple of (changed or added sources, deleted sources)
+        """
+        changed = [
+            source for source, entry in current.items()
+            if source not in previous or previous[source]["sha256"] != entry["sha256"]
+        ]
+        deleted = [source for source in previous if source not in current]
+        return changed, deleted
 
-        return documents
-    
     def chunk_documents(self, documents: List[Document]) -> List[Document]:
         """Split documents using a simple overlapping character window."""
         if not documents:
             return []
-        chunked: List[Document] = []
+        return [chunk.to_document() for chunk in self.iter_chunks(documents)]
+
+    def iter_chunks(self, documents: Iterable[Document]) -> Iterator[TextChunk]:
+        """
+        Lazily split documents into chunks
+
+        Chunks are :class:`TextChunk` views into each document's text, so the
+        overlapping windows share one string instead of copying it.
+        """
+        token_chunks = self.chunk_unit == "tokens" and self._get_encoding() is not None
         step = max(1, self.chunk_size - self.chunk_overlap)
         for doc in documents:
+            if isinstance(doc, MappedDocument):
+                yield from self._iter_mapped_chunks(doc)
+                continue
+            if token_chunks:
+                yield from self._iter_token_chunks(doc)
+                continue
             text = doc.page_content
             length = len(text)
             if length <= self.chunk_size:
-                chunked.append(doc)
+                yield TextChunk(text, doc.metadata)
                 continue
             for start in range(0, length, step):
                 end = min(start + self.chunk_size, length)
-                segment = text[start:end]
-                if not segment.strip():
+                if not _NON_SPACE.search(text, start, end):
                     continue
-                meta = dict(doc.metadata)
-                meta.update({"chunk_start": start, "chunk_end": end})
-                chunked.append(Document(page_content=segment, metadata=meta))
+                yield TextChunk(text, doc.metadata, start, end)
                 if end >= length:
                     break
-        return chunked
+
+    def _should_map(self, file_path: Path) -> bool:
+        if self.mmap_threshold is None:
+            return False
+        size = file_path.stat().st_size
+        return size > 0 and size >= self.mmap_threshold
+
+    def _iter_mapped_chunks(self, doc: MappedDocument) -> Iterator[TextChunk]:
+        """
+        Character-window chunking directly on a memory-mapped file
+
+        Windows are measured in bytes (tokens are approximated as 4 bytes in
+        token mode) and snapped to UTF-8 character boundaries; whitespace-only
+        windows are skipped by searching the mapping, so nothing is decoded here.
+        The mapping only lives while the file is being chunked.
+        """
+        mapped = doc.text
+        scale = _CHARS_PER_TOKEN if self.chunk_unit == "tokens" else 1
+        size = self.chunk_size * scale
+        step = max(1, (self.chunk_size - self.chunk_overlap) * scale)
+        length = len(mapped)
+        start = 0
+        with mapped.mapped() as buffer:
+            while start < length:
+                end = min(start + size, length)
+                if end < length:
+                    end = max(_utf8_end(buffer, end), start + 1)
+                if _NON_SPACE_BYTES.search(buffer, start, end):
+                    yield TextChunk(mapped, doc.metadata, start, end)
+                if end >= length:
+                    break
+                start = _utf8_start(buffer, start + step)
+
+    def _get_encoding(self):
+        """Load the tiktoken encoding, falling back to character chunks if unavailable."""
+        if self._encoding is None and self.chunk_unit == "tokens":
+            try:
+                if tiktoken is None:
+                    raise ImportError("tiktoken is not installed")
+                self._encoding = tiktoken.get_encoding(self.encoding_name)
+            except Exception as e:
+                print(
+                    f"Warning: tiktoken encoding {self.encoding_name} unavailable ({e}); "
+                    f"falling back to character chunks"
+                )
+                self.chunk_unit = "chars"
+                self.chunk_size *= _CHARS_PER_TOKEN
+                self.chunk_overlap *= _CHARS_PER_TOKEN
+        return self._encoding
+
+    def _iter_token_chunks(self, doc: Document) -> Iterator[TextChunk]:
+        """Pack sentence/line segments into chunks of at most ``chunk_size`` tokens."""
+        text = doc.page_content
+        spans: List[Tuple[int, int]] = []
+        pos = 0
+        for match in _SEGMENT_BREAK.finditer(text):
+            if match.end() > pos:
+                spans.append((pos, match.end()))
+                pos = match.end()
+        if pos < len(text):
+            spans.append((pos, len(text)))
+        if not spans:
+            return
+
+        # One batched call for all segments of the document
+        tokens = self._encoding.encode_ordinary_batch([text[s:e] for s, e in spans])
+        counts = [len(t) for t in tokens]
+        if sum(counts) <= self.chunk_size:
+            yield TextChunk(text, doc.metadata)
+            return
+
+        def emit(indices: List[int]) -> Iterator[TextChunk]:
+            start, end = spans[indices[0]][0], spans[indices[-1]][1]
+            if _NON_SPACE.search(text, start, end):
+                yield TextChunk(text, doc.metadata, start, end)
+
+        current: List[int] = []
+        current_tokens = 0
+        has_body = False
+        for i, (start, end) in enumerate(spans):
+            heading = _MARKDOWN_HEADING.match(text, start) is not None
+            if heading and has_body:
+                # Sections start a fresh chunk (no overlap across headings)
+                yield from emit(current)
+                current, current_tokens, has_body = [], 0, False
+
+            if counts[i] > self.chunk_size:
+                if current:
+                    yield from emit(current)
+                    current, current_tokens, has_body = [], 0, False
+                yield from self._split_segment(doc, start, end, tokens[i])
+                continue
+
+            if current and current_tokens + counts[i] > self.chunk_size:
+                yield from emit(current)
+                keep: List[int] = []
+                kept_tokens = 0
+                for j in reversed(current):
+                    if (kept_tokens + counts[j] > self.chunk_overlap
+                            or kept_tokens + counts[j] + counts[i] > self.chunk_size):
+                        break
+                    keep.insert(0, j)
+                    kept_tokens += counts[j]
+                current, current_tokens = keep, kept_tokens
+
+            current.append(i)
+            current_tokens += counts[i]
+            has_body = has_body or not heading
+        if current:
+            yield from emit(current)
+
+    def _split_segment(
+        self,
+        doc: Document,
+        start: int,
+        end: int,
+        tokens: List[int]
+    ) -> Iterator[TextChunk]:
+        """Split one over-long segment on token boundaries."""
+        _, offsets = self._encoding.decode_with_offsets(tokens)
+        step = max(1, self.chunk_size - self.chunk_overlap)
+        for t0 in range(0, len(tokens), step):
+            t1 = min(t0 + self.chunk_size, len(tokens))
+            chunk_start = start + offsets[t0]
+            chunk_end = start + offsets[t1] if t1 < len(tokens) else end
+            if _NON_SPACE.search(doc.page_content, chunk_start, chunk_end):
+                yield TextChunk(doc.page_content, doc.metadata, chunk_start, chunk_end)
+            if t1 >= len(tokens):
+                break
     
     def load_and_chunk(self, directory_path: str) -> List[Document]:
         """
@@ -114,3 +718,22 @@ class DocumentLoader:
         print(f"Loaded {len(documents)} documents, created {len(chunks)} chunks from {directory_path}")
         return chunks
 
+    def stream_chunks(self, directory_path: str) -> Iterator[TextChunk]:
+        """
+        Lazily load and chunk documents from a directory
+
+        Unlike :meth:`load_and_chunk` neither the loaded documents nor the
+        chunks are collected into lists, so a consumer that indexes chunks as
+        they arrive only holds the files currently being processed.
+
+        Args:
+            directory_path: Path to directory containing documents
+
+        Yields:
+            TextChunk views (call ``to_document()`` to materialize)
+        """
+        chunks = 0
+        for chunk in self.iter_chunks(self.iter_directory(directory_path)):
+            chunks += 1
+            yield chunk
+        print(f"Streamed {chunks} chunks from {directory_path}")
@@ -0,0 +1,141 @@
+"""On-disk snapshots for the in-memory vector stores.
+
+A snapshot is a single uncompressed ``.npz`` archive holding the arrays a
+store needs (CSR matrix parts, IDF weights, packed source texts, ...) plus a
+JSON header with the format version and any non-array state. A SHA-256
+checksum over the header and every array is stored alongside so truncated
+or hand-edited files are rejected instead of silently serving bad results.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 2: chunks stored as offsets into shared per-file texts
+SNAPSHOT_FORMAT_VERSION = 2
+SNAPSHOT_SUFFIX = ".snapshot.npz"
+
+_META_KEY = "__meta__"
+_CHECKSUM_KEY = "__checksum__"
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is missing, corrupt or from another format version."""
+
+
+def snapshot_path(persist_directory: str, collection_name: str) -> Path:
+    """Return the snapshot file path for a collection."""
+    return Path(persist_directory) / f"{collection_name}{SNAPSHOT_SUFFIX}"
+
+
+def pack_strings(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack strings into one UTF-8 byte buffer plus an offsets array
+
+    Fixed-width numpy unicode arrays pad every entry to the longest one, which
+    is wasteful for chunk texts, so strings are concatenated instead.
+
+    Args:
+        values: Strings to pack
+
+    Returns:
+        Tuple of (uint8 buffer, int64 offsets of length len(values) + 1)
+    """
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return buffer, offsets
+
+
+def unpack_strings(buffer: np.ndarray, offsets: np.ndarray) -> List[str]:
+    """Inverse of :func:`pack_strings`."""
+    raw = buffer.tobytes()
+    bounds = offsets.tolist()
+    return [raw[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
+
+
+def _checksum(meta_bytes: bytes, arrays: Dict[str, np.ndarray]) -> str:
+    digest = hashlib.sha256(meta_bytes)
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(name.encode("utf-8"))
+        digest.update(str(array.dtype).encode("ascii"))
+        digest.update(str(array.shape).encode("ascii"))
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def write_snapshot(path: Path, arrays: Dict[str, np.ndarray], meta: Dict) -> str:
+    """
+    Atomically write a snapshot file
+
+    Args:
+        path: Destination file
+        arrays: Named numpy arrays to store
+        meta: JSON-serializable header (the format version is added here)
+
+    Returns:
+        Hex checksum of the written snapshot
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = dict(meta)
+    header["format_version"] = SNAPSHOT_FORMAT_VERSION
+    meta_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    checksum = _checksum(meta_bytes, arrays)
+
+    payload = dict(arrays)
+    payload[_META_KEY] = np.frombuffer(meta_bytes, dtype=np.uint8)
+    payload[_CHECKSUM_KEY] = np.frombuffer(checksum.encode("ascii"), dtype=np.uint8)
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as fh:
+        np.savez(fh, **payload)
+    os.replace(tmp_path, path)
+    return checksum
+
+
+def read_snapshot(path: Path) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Read and validate a snapshot file
+
+    Args:
+        path: Snapshot file
+
+    Returns:
+        Tuple of (arrays, header); the header includes ``checksum``
+
+    Raises:
+        SnapshotError: If the file is missing, unreadable, fails checksum
+            validation or was written by a different format version
+    """
+    path = Path(path)
+    if not path.exists():
+        raise SnapshotError(f"Snapshot {path} does not exist")
+    try:
+        with np.load(path, allow_pickle=False) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+    except Exception as e:
+        raise SnapshotError(f"Snapshot {path} is unreadable: {e}") from e
+
+    if _META_KEY not in arrays or _CHECKSUM_KEY not in arrays:
+        raise SnapshotError(f"Snapshot {path} is missing its header")
+    meta_bytes = arrays.pop(_META_KEY).tobytes()
+    stored_checksum = arrays.pop(_CHECKSUM_KEY).tobytes().decode("ascii")
+    if _checksum(meta_bytes, arrays) != stored_checksum:
+        raise SnapshotError(f"Snapshot {path} failed checksum validation")
+
+    meta = json.loads(meta_bytes.decode("utf-8"))
+    version: Optional[int] = meta.get("format_version")
+    if version != SNAPSHOT_FORMAT_VERSION:
+        raise SnapshotError(
+            f"Snapshot {path} has format version {version}, expected {SNAPSHOT_FORMAT_VERSION}"
+        )
+    meta["checksum"] = stored_checksum
+    return arrays, meta
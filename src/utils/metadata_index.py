@@ -0,0 +1,153 @@
+"""Inverted index over chunk metadata for pre-filtered retrieval.
+
+Scalar metadata of every chunk's source document (``source``, ``domain``,
+``page``, ``total_pages``, ...) maps each value to the sorted row ids that
+carry it; numeric values and the per-chunk ``chunk_start``/``chunk_end``
+offsets also get a sorted column for range lookups. A filter resolves to a
+sorted row-id array through these postings without touching the chunks, so
+the store only scores the selected rows.
+
+Filters use the Chroma/LangChain syntax: ``{"source": "a.txt"}``,
+``{"source": {"$in": ["a.txt", "b.txt"]}}``, ``{"page": {"$gte": 2, "$lte": 5}}``
+and ``{"$and": [...]}`` / ``{"$or": [...]}``. Several keys in one dict are
+combined with AND.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.document_loader import TextChunk
+
+_CHUNK_OFFSETS = ("chunk_start", "chunk_end")
+_RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool)
+
+
+class MetadataIndex:
+    """Value -> row ids postings plus sorted numeric columns for chunk metadata"""
+
+    def __init__(self, chunks: Iterable[TextChunk]):
+        """
+        Args:
+            chunks: Indexed chunks in row order
+        """
+        postings: Dict[str, Dict[Any, List[int]]] = {}
+        numbers: Dict[str, Tuple[List[int], List[float]]] = {}
+        n_rows = 0
+        for row, chunk in enumerate(chunks):
+            n_rows = row + 1
+            for key, value in chunk.source_metadata.items():
+                if isinstance(value, (str, bool)) or _is_number(value):
+                    postings.setdefault(key, {}).setdefault(value, []).append(row)
+                if _is_number(value):
+                    rows, values = numbers.setdefault(key, ([], []))
+                    rows.append(row)
+                    values.append(value)
+            if chunk.chunk_start is not None:
+                for key, value in zip(_CHUNK_OFFSETS, (chunk.chunk_start, chunk.chunk_end)):
+                    rows, values = numbers.setdefault(key, ([], []))
+                    rows.append(row)
+                    values.append(value)
+        self.n_rows = n_rows
+        self._postings = {
+            key: {value: np.asarray(rows, dtype=np.int64) for value, rows in by_value.items()}
+            for key, by_value in postings.items()
+        }
+        # Numeric columns sorted by value: a range is two binary searches
+        self._columns: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for key, (rows, values) in numbers.items():
+            values = np.asarray(values, dtype=np.float64)
+            order = np.argsort(values, kind="stable")
+            self._columns[key] = (values[order], np.asarray(rows, dtype=np.int64)[order])
+
+    def values(self, key: str) -> List[Any]:
+        """Distinct indexed values of a metadata key."""
+        return sorted(self._postings.get(key, {}), key=str)
+
+    def _equal(self, key: str, value: Any) -> np.ndarray:
+        rows = self._postings.get(key, {}).get(value)
+        if rows is not None:
+            return rows
+        if key in _CHUNK_OFFSETS and _is_number(value):
+            return self._range(key, {"$gte": value, "$lte": value})
+        return np.empty(0, dtype=np.int64)
+
+    def _range(self, key: str, bounds: Dict[str, Any]) -> np.ndarray:
+        if key not in self._columns:
+            return np.empty(0, dtype=np.int64)
+        values, rows = self._columns[key]
+        start, end = 0, len(values)
+        if "$gte" in bounds:
+            start = max(start, np.searchsorted(values, bounds["$gte"], side="left"))
+        if "$gt" in bounds:
+            start = max(start, np.searchsorted(values, bounds["$gt"], side="right"))
+        if "$lte" in bounds:
+            end = min(end, np.searchsorted(values, bounds["$lte"], side="right"))
+        if "$lt" in bounds:
+            end = min(end, np.searchsorted(values, bounds["$lt"], side="left"))
+        return np.sort(rows[start:end]) if start < end else np.empty(0, dtype=np.int64)
+
+    def _condition(self, key: str, condition: Any) -> np.ndarray:
+        if not isinstance(condition, dict):
+            return self._equal(key, condition)
+        parts = []
+        for operator, operand in condition.items():
+            if operator == "$eq":
+                parts.append(self._equal(key, operand))
+            elif operator == "$in":
+                matches = [self._equal(key, value) for value in operand]
+                parts.append(np.unique(np.concatenate(matches)) if matches else np.empty(0, dtype=np.int64))
+            elif operator == "$ne":
+                parts.append(np.setdiff1d(np.arange(self.n_rows), self._equal(key, operand), assume_unique=True))
+            elif operator == "$nin":
+                excluded = [self._equal(key, value) for value in operand]
+                parts.append(np.setdiff1d(np.arange(self.n_rows), np.concatenate(excluded) if excluded else []))
+            elif operator not in _RANGE_OPERATORS:
+                raise ValueError(f"Unsupported metadata filter operator: {operator}")
+        bounds = {op: condition[op] for op in _RANGE_OPERATORS if op in condition}
+        if bounds:
+            parts.append(self._range(key, bounds))
+        return _intersect(parts)
+
+    def rows(self, where: Dict[str, Any]) -> np.ndarray:
+        """
+        Resolve a metadata filter to row ids
+
+        Args:
+            where: Filter dict (see the module docstring)
+
+        Returns:
+            Sorted unique row ids of the matching chunks
+        """
+        parts = []
+        for key, condition in where.items():
+            if key == "$and":
+                parts.append(_intersect([self.rows(sub) for sub in condition]))
+            elif key == "$or":
+                matches = [self.rows(sub) for sub in condition]
+                parts.append(np.unique(np.concatenate(matches)) if matches else np.empty(0, dtype=np.int64))
+            else:
+                parts.append(self._condition(key, condition))
+        return _intersect(parts) if parts else np.arange(self.n_rows)
+
+    def mask(self, where: Dict[str, Any]) -> np.ndarray:
+        """Boolean row mask of a metadata filter."""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.rows(where)] = True
+        return mask
+
+
+def _intersect(parts: List[np.ndarray]) -> np.ndarray:
+    if not parts:
+        return np.empty(0, dtype=np.int64)
+    rows: Optional[np.ndarray] = None
+    # Smallest first keeps every intersection as cheap as possible
+    for part in sorted(parts, key=len):
+        rows = part if rows is None else np.intersect1d(rows, part, assume_unique=True)
+        if not len(rows):
+            break
+    return rows
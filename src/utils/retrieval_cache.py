@@ -0,0 +1,129 @@
+"""Bounded LRU/TTL cache of retrieval results.
+
+Entries are keyed by (collection, index version, normalized query, k). Every
+rebuild or patch of a collection produces a store with a new version, so
+results of an older index are never served; the manager also drops them
+eagerly when it swaps a collection in.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from langchain.schema import Document
+
+Key = Tuple[Hashable, str, int]
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query (the vectorizers ignore both)."""
+    return " ".join(query.lower().split())
+
+
+class RetrievalCache:
+    """Thread-safe LRU cache of document lists with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 300.0):
+        """
+        Args:
+            max_entries: Maximum number of cached results (least recently
+                used entries are evicted first)
+            ttl_seconds: Seconds an entry stays valid (None or 0 = no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds or None
+        self._entries: "OrderedDict[Key, Tuple[float, List[Document]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def key(scope: Hashable, query: str, k: int) -> Key:
+        """
+        Args:
+            scope: (collection name, index version, ...) of the searched index
+            query: Query text
+            k: Number of documents requested
+        """
+        return (scope, normalize_query(query), k)
+
+    def get(self, key: Key) -> Optional[List[Document]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < now:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[1])
+
+    def put(self, key: Key, documents: List[Document]) -> None:
+        if self.max_entries <= 0:
+            return
+        expires = time.monotonic() + self.ttl_seconds if self.ttl_seconds else float("inf")
+        with self._lock:
+            self._entries[key] = (expires, list(documents))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(
+        self,
+        scope: Hashable,
+        query: str,
+        k: int,
+        compute: Callable[[], List[Document]]
+    ) -> List[Document]:
+        """Return the cached result for a query or compute and store it."""
+        key = self.key(scope, query, k)
+        documents = self.get(key)
+        if documents is None:
+            documents = compute()
+            self.put(key, documents)
+        return documents
+
+    def invalidate(self, collection_name: Optional[str] = None) -> int:
+        """
+        Drop cached results of one collection (or of all collections)
+
+        Args:
+            collection_name: Collection whose entries are dropped (None = all)
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if collection_name is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            stale = [key for key in self._entries if key[0][0] == collection_name]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,228 @@
+"""Vector store whose chunks are split across worker processes.
+
+Every shard process holds its own slice of the chunks and their TF-IDF rows,
+so scoring runs on one core per shard and no single process has to hold the
+whole corpus. Scores are only comparable across shards when every shard
+weights terms the same way, so the store always uses hashed features: shards
+hash their chunks, the coordinator sums their document frequencies and
+broadcasts one global IDF. Queries are encoded once by the coordinator,
+scattered to every shard over its pipe, and the per-shard top-k lists are
+merged with a heap.
+"""
+
+import heapq
+import multiprocessing
+import threading
+import weakref
+from itertools import islice
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain.schema import BaseRetriever, Document
+from scipy import sparse
+
+from src.utils.vector_store import (
+    HashingTfidf,
+    SearchRetriever,
+    as_document,
+    next_index_version,
+    top_k_per_row,
+)
+
+# Chunks are streamed to the shards in batches of this size
+_SEND_BATCH_SIZE = 256
+
+
+def _shard_main(conn: Any, n_features: int) -> None:
+    """Shard process loop: answers (command, payload) messages from the coordinator."""
+    encoder = HashingTfidf(n_features=n_features)
+    documents: List[Document] = []
+    parts: List[sparse.csr_matrix] = []
+    counts = sparse.csr_matrix((0, n_features))
+    postings = None
+    failed: Optional[Exception] = None
+    while True:
+        command, payload = conn.recv()
+        try:
+            reply = None
+            if command == "add":
+                documents.extend(payload)
+                parts.append(encoder.term_counts(doc.page_content for doc in payload))
+                continue
+            if command == "close":
+                conn.close()
+                return
+            if command == "df":
+                if failed is not None:
+                    raise failed
+                if parts:
+                    counts = sparse.vstack([counts] + parts, format="csr")
+                    parts = []
+                df = encoder.document_frequency(counts)
+                columns = np.flatnonzero(df)
+                reply = (counts.shape[0], columns, df[columns])
+            elif command == "idf":
+                encoder.idf_ = payload
+                # Term-major rows: a query only reads the rows of its own terms
+                postings = encoder.weight(counts).T.tocsr() if counts.shape[0] else None
+                reply = len(documents)
+            elif command == "search":
+                queries, k = payload
+                if postings is None:
+                    reply = [[] for _ in range(queries.shape[0])]
+                else:
+                    reply = [
+                        [(float(score), documents[i]) for i, score in zip(ids, scores)]
+                        for ids, scores in top_k_per_row(queries @ postings, k, pad=False)
+                    ]
+        except Exception as e:  # report to the coordinator instead of dying silently
+            if command == "add":
+                # "add" has no reply; the error surfaces on the next "df"
+                failed = e
+                continue
+            reply = e
+        conn.send(reply)
+
+
+def _shutdown(conns: List[Any], processes: List[Any]) -> None:
+    for conn in conns:
+        try:
+            conn.send(("close", None))
+            conn.close()
+        except (OSError, EOFError, BrokenPipeError):
+            pass
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+
+
+class ShardedVectorStore:
+    """TF-IDF store scattered across shard processes with a heap-merged top-k"""
+
+    def __init__(
+        self,
+        documents: Iterable[Any],
+        n_shards: int,
+        manifest: Optional[dict] = None,
+        n_features: int = 2 ** 20,
+        build_params: Optional[dict] = None
+    ):
+        """
+        Args:
+            documents: Chunks (TextChunk or Document); may be a lazy iterator,
+                dealt round-robin to the shards and sent in batches
+            n_shards: Number of shard processes
+            manifest: Per-file fingerprints the chunks were built from
+            n_features: Hashed feature columns (see HashingTfidf)
+            build_params: Loader and dedup settings the chunks were built with
+        """
+        if n_shards < 1:
+            raise ValueError("n_shards must be at least 1")
+        self.manifest = manifest
+        self.build_params = build_params
+        self.n_shards = n_shards
+        self.collection_name: Optional[str] = None
+        self.cache = None
+        self.version = next_index_version()
+        self._encoder = HashingTfidf(n_features=n_features)
+        self._lock = threading.Lock()
+        # Spawned, not forked: the parent runs the retrieval pool and watcher
+        # threads, whose locks a forked child could inherit mid-acquire
+        context = multiprocessing.get_context("spawn")
+        self._conns = []
+        self._processes = []
+        for shard in range(n_shards):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_shard_main, args=(child, n_features), name=f"index-shard-{shard}", daemon=True
+            )
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+        self._finalizer = weakref.finalize(self, _shutdown, self._conns, self._processes)
+        self._sizes = self._fit(documents)
+
+    def _fit(self, documents: Iterable[Any]) -> List[int]:
+        # Chunk i goes to shard i % n_shards, sent in per-shard batches
+        batches: List[List[Document]] = [[] for _ in self._conns]
+        for row, doc in enumerate(documents):
+            batch = batches[row % self.n_shards]
+            batch.append(as_document(doc))
+            if len(batch) >= _SEND_BATCH_SIZE:
+                self._conns[row % self.n_shards].send(("add", batch))
+                batches[row % self.n_shards] = []
+        for conn, batch in zip(self._conns, batches):
+            if batch:
+                conn.send(("add", batch))
+
+        # Global IDF from the summed per-shard document frequencies
+        for conn in self._conns:
+            conn.send(("df", None))
+        df = np.zeros(self._encoder.n_features, dtype=np.int64)
+        n_docs = 0
+        for shard_docs, columns, counts in self._gather():
+            df[columns] += counts
+            n_docs += shard_docs
+        self._encoder.idf_ = self._encoder.smoothed_idf(df, n_docs)
+        for conn in self._conns:
+            conn.send(("idf", self._encoder.idf_))
+        return self._gather()
+
+    def _gather(self) -> List[Any]:
+        replies = [conn.recv() for conn in self._conns]
+        for shard, reply in enumerate(replies):
+            if isinstance(reply, Exception):
+                raise RuntimeError(f"Index shard {shard} failed: {reply}") from reply
+        return replies
+
+    def _scatter(self, queries: List[str], k: int) -> List[List[Document]]:
+        encoded = self._encoder.transform(queries)
+        with self._lock:
+            for conn in self._conns:
+                conn.send(("search", (encoded, k)))
+            per_shard = self._gather()
+        results = []
+        for hits in zip(*per_shard):
+            # Every shard list is sorted best first; ties keep shard order
+            merged = heapq.merge(*hits, key=lambda hit: -hit[0])
+            results.append([doc for _, doc in islice(merged, k)])
+        return results
+
+    def search(self, query: str, k: int = 5) -> List[Document]:
+        """
+        Top-k chunks for a query over all shards
+
+        Args:
+            query: Query text
+            k: Number of documents
+
+        Returns:
+            Up to k documents, best first; chunks sharing no term with the
+            query are not returned
+        """
+        return self._scatter([query], k)[0]
+
+    def retrieve_batch(self, queries: List[str], k: int = 5) -> List[List[Document]]:
+        """Retrieve the top k documents for every query in one round trip per shard."""
+        return self._scatter(list(queries), k) if queries else []
+
+    @property
+    def cache_scope(self) -> Tuple[Optional[str], int]:
+        return (self.collection_name, self.version)
+
+    def as_retriever(self, search_kwargs: Optional[dict] = None) -> BaseRetriever:
+        top_k = (search_kwargs or {}).get("k", 5)
+        return SearchRetriever(searcher=self, top_k=top_k, cache=self.cache, cache_scope=self.cache_scope)
+
+    def __len__(self) -> int:
+        return sum(self._sizes)
+
+    @property
+    def shard_sizes(self) -> List[int]:
+        return list(self._sizes)
+
+    def close(self) -> None:
+        """Stop the shard processes (also done when the store is garbage collected)."""
+        self._finalizer()
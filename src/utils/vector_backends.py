@@ -0,0 +1,338 @@
+"""Persistent Chroma and FAISS vector stores selected by Config.VECTOR_STORE_TYPE.
+
+Unlike SimpleVectorStore these keep the index (and the chunk texts) on disk,
+so collections survive restarts without a snapshot reload and are not bound
+by RAM. Both are updated in place per source file: every chunk gets a stable
+id derived from its source path, and a small JSON state file next to the
+index records the file manifest plus the chunk ids of every source, so
+refresh_vector_store can delete and re-add only changed files.
+
+In-place updates are not hot-swapped like SimpleVectorStore snapshots: an
+update holds the store's write lock from the first delete to the last add,
+and retrievals wait for it instead of reading a half-updated index.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from langchain.schema import BaseRetriever, Document
+
+from src.config import Config
+
+try:
+    import chromadb
+    from langchain_community.vectorstores import Chroma
+except Exception:
+    chromadb = None
+    Chroma = None
+
+try:
+    import faiss  # noqa: F401
+    from langchain_community.vectorstores import FAISS
+except Exception:
+    FAISS = None
+
+try:
+    from langchain_openai import OpenAIEmbeddings
+except Exception:
+    OpenAIEmbeddings = None
+
+_ADD_BATCH_SIZE = 256
+
+
+def _store_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Chroma only accepts scalar metadata values: drop None, JSON-encode the rest."""
+    return {
+        key: value if isinstance(value, (str, int, float, bool)) else json.dumps(value)
+        for key, value in metadata.items() if value is not None
+    }
+
+
+def build_embeddings(model: Optional[str] = None) -> Any:
+    """
+    Embedding model for the persistent stores
+
+    Args:
+        model: Embedding model name (default Config.EMBEDDING_MODEL)
+
+    Returns:
+        OpenAI-compatible embeddings served from Config.EMBEDDING_BASE_URL
+
+    Raises:
+        ImportError: If langchain-openai is not installed
+        ValueError: If no API key is configured
+    """
+    if OpenAIEmbeddings is None:
+        raise ImportError("VECTOR_STORE_TYPE=chroma/faiss requires the langchain-openai package for embeddings")
+    if not Config.OPENAI_API_KEY:
+        raise ValueError("VECTOR_STORE_TYPE=chroma/faiss requires an API key for the embedding model")
+    return OpenAIEmbeddings(
+        model=model or Config.EMBEDDING_MODEL,
+        openai_api_key=Config.OPENAI_API_KEY,
+        openai_api_base=Config.EMBEDDING_BASE_URL,
+    )
+
+
+class ReadWriteLock:
+    """Many concurrent readers or one writer; waiting writers block new readers"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class GuardedRetriever(BaseRetriever):
+    """Retriever that searches under a store's read lock"""
+
+    retriever: Any
+    lock: Any
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(self, query: str) -> List[Document]:
+        with self.lock.reading():
+            return self.retriever.invoke(query)
+
+
+class PersistentVectorStore(ABC):
+    """Base class for on-disk stores with per-source incremental updates"""
+
+    backend_name = ""
+
+    def __init__(self, collection_name: str, persist_directory: str, embeddings: Any):
+        """
+        Args:
+            collection_name: Name of the collection
+            persist_directory: Directory holding the index and state file
+            embeddings: LangChain-style embeddings (embed_documents/embed_query)
+        """
+        self.collection_name = collection_name
+        self.persist_directory = Path(persist_directory)
+        self.embeddings = embeddings
+        self._state_path = self.persist_directory / f"{collection_name}.{self.backend_name}.json"
+        state = {}
+        if self._state_path.exists():
+            try:
+                state = json.loads(self._state_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"Warning: Ignoring {self.backend_name} state for {collection_name}: {e}")
+        self.manifest: Optional[Dict[str, Dict]] = state.get("manifest")
+        self.build_params: Optional[Dict[str, Any]] = state.get("build_params")
+        self._chunk_ids: Dict[str, List[str]] = state.get("chunk_ids", {})
+        self._lock = ReadWriteLock()
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._chunk_ids.values())
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._chunk_ids)
+
+    def update(
+        self,
+        sources: List[str],
+        new_documents: Iterable[Any],
+        manifest: Optional[Dict[str, Dict]],
+        build_params: Optional[Dict[str, Any]] = None
+    ) -> "PersistentVectorStore":
+        """
+        Replace the chunks of some source files in place
+
+        Retrievals of this store wait until the update is complete.
+
+        Args:
+            sources: Source paths whose stored chunks are deleted first
+            new_documents: Chunks (TextChunk or Document) to add, in batches
+            manifest: Manifest describing the updated file set
+            build_params: Loader and dedup settings the chunks were built with
+
+        Returns:
+            This store
+        """
+        with self._lock.writing():
+            stale = [chunk_id for source in sources for chunk_id in self._chunk_ids.pop(source, [])]
+            if stale:
+                self._delete(stale)
+
+            texts: List[str] = []
+            metadatas: List[Dict] = []
+            ids: List[str] = []
+            for doc in new_documents:
+                source = str(doc.metadata.get("source", ""))
+                source_ids = self._chunk_ids.setdefault(source, [])
+                prefix = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+                chunk_id = f"{prefix}:{len(source_ids)}"
+                source_ids.append(chunk_id)
+                texts.append(doc.page_content)
+                metadatas.append(_store_metadata(doc.metadata))
+                ids.append(chunk_id)
+                if len(texts) >= _ADD_BATCH_SIZE:
+                    self._add(texts, metadatas, ids)
+                    texts, metadatas, ids = [], [], []
+            if texts:
+                self._add(texts, metadatas, ids)
+
+            self.manifest = manifest
+            self.build_params = build_params
+            self._persist()
+            self._save_state()
+        return self
+
+    def as_retriever(
+        self,
+        search_kwargs: Optional[dict] = None,
+        search_type: Optional[str] = None
+    ) -> BaseRetriever:
+        search_type = search_type or Config.RETRIEVAL_SEARCH_TYPE
+        # merge_adjacent is specific to SimpleVectorStore chunks
+        kwargs = {k: v for k, v in {"k": 5, **(search_kwargs or {})}.items() if k != "merge_adjacent"}
+        if search_type == "mmr":
+            kwargs.setdefault("fetch_k", Config.MMR_FETCH_K)
+            kwargs.setdefault("lambda_mult", Config.MMR_LAMBDA)
+        with self._lock.reading():
+            retriever = self._vectorstore().as_retriever(search_type=search_type, search_kwargs=kwargs)
+        return GuardedRetriever(retriever=retriever, lock=self._lock)
+
+    def retrieve_batch(self, queries: List[str], k: int = 5) -> List[List[Document]]:
+        """Retrieve the top k documents for every query."""
+        retriever = self.as_retriever(search_kwargs={"k": k})
+        return [retriever.invoke(query) for query in queries]
+
+    def _save_state(self) -> None:
+        self.persist_directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._state_path.with_name(self._state_path.name + ".tmp")
+        tmp_path.write_text(
+            json.dumps({
+                "manifest": self.manifest,
+                "build_params": self.build_params,
+                "chunk_ids": self._chunk_ids,
+            }), encoding="utf-8"
+        )
+        os.replace(tmp_path, self._state_path)
+
+    @abstractmethod
+    def _vectorstore(self) -> Any:
+        """The underlying LangChain vector store."""
+
+    @abstractmethod
+    def _add(self, texts: List[str], metadatas: List[Dict], ids: List[str]) -> None:
+        """Embed and store one batch of chunks under the given ids."""
+
+    @abstractmethod
+    def _delete(self, ids: List[str]) -> None:
+        """Remove stored chunks by id."""
+
+    def _persist(self) -> None:
+        """Flush the index to disk after an update (no-op for write-through stores)."""
+
+
+class ChromaVectorStore(PersistentVectorStore):
+    """Embedded persistent Chroma collection"""
+
+    backend_name = "chroma"
+
+    def __init__(self, collection_name: str, persist_directory: str, embeddings: Any):
+        if Chroma is None:
+            raise ImportError("VECTOR_STORE_TYPE=chroma requires the chromadb package")
+        super().__init__(collection_name, persist_directory, embeddings)
+        # chromadb >= 0.4 writes through to persist_directory on every change
+        self._store = Chroma(
+            collection_name=collection_name,
+            embedding_function=embeddings,
+            persist_directory=str(self.persist_directory),
+            client_settings=chromadb.config.Settings(
+                is_persistent=True,
+                persist_directory=str(self.persist_directory),
+                anonymized_telemetry=False,
+            ),
+        )
+
+    def _vectorstore(self) -> Any:
+        return self._store
+
+    def _add(self, texts: List[str], metadatas: List[Dict], ids: List[str]) -> None:
+        self._store.add_texts(texts, metadatas=metadatas, ids=ids)
+
+    def _delete(self, ids: List[str]) -> None:
+        self._store.delete(ids=ids)
+
+
+class FAISSVectorStore(PersistentVectorStore):
+    """Local FAISS index saved under ``<persist_directory>/<collection>.faiss``"""
+
+    backend_name = "faiss"
+
+    def __init__(self, collection_name: str, persist_directory: str, embeddings: Any):
+        if FAISS is None:
+            raise ImportError("VECTOR_STORE_TYPE=faiss requires the faiss-cpu package")
+        super().__init__(collection_name, persist_directory, embeddings)
+        self._folder = self.persist_directory / f"{collection_name}.faiss"
+        self._store = None
+        if self._folder.exists():
+            # The index and its pickled docstore are written by this class only
+            self._store = FAISS.load_local(
+                str(self._folder), embeddings, allow_dangerous_deserialization=True
+            )
+
+    def _vectorstore(self) -> Any:
+        if self._store is None:
+            raise ValueError(f"FAISS collection {self.collection_name} is empty")
+        return self._store
+
+    def _add(self, texts: List[str], metadatas: List[Dict], ids: List[str]) -> None:
+        if self._store is None:
+            self._store = FAISS.from_texts(texts, self.embeddings, metadatas=metadatas, ids=ids)
+        else:
+            self._store.add_texts(texts, metadatas=metadatas, ids=ids)
+
+    def _delete(self, ids: List[str]) -> None:
+        if self._store is not None:
+            self._store.delete(ids)
+
+    def _persist(self) -> None:
+        if self._store is not None:
+            self._store.save_local(str(self._folder))
+
+
+PERSISTENT_STORES = {
+    "chroma": ChromaVectorStore,
+    "faiss": FAISSVectorStore,
+}
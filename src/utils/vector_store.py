@@ -3,101 +3,2174 @@ Vector store setup and management for RAG agents
 """
 
 import os
+import re
+import math
+import copy
+import json
+import asyncio
 import hashlib
-from typing import List, Optional
+import threading
+import weakref
+from abc import abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from itertools import chain, count
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 from dataclasses import dataclass
 from langchain.schema import Document, BaseRetriever
+from langchain.schema.embeddings import Embeddings
 from typing import Any
-from sklearn.feature_extraction.text import TfidfVectorizer
+import numpy as np
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
 
 from src.config import Config
+from src.utils.dedup import MinHashDeduplicator
+from src.utils.document_loader import MappedText, TextChunk
+from src.utils.metadata_index import MetadataIndex
+from src.utils.index_snapshot import (
+    SnapshotError,
+    pack_strings,
+    read_snapshot,
+    snapshot_path,
+    unpack_strings,
+    write_snapshot,
+)
+from src.utils.retrieval_cache import RetrievalCache
+from src.utils.vector_backends import PERSISTENT_STORES, PersistentVectorStore, build_embeddings
 
 
-class SimpleEmbeddings:
+def _digest_batch(texts: List[str]) -> bytes:
+    """Concatenated SHA-256 digests of the lower-cased texts (pool entry point)."""
+    return b"".join(hashlib.sha256(text.lower().encode()).digest() for text in texts)
+
+
+class SimpleEmbeddings(Embeddings):
     """Simple deterministic embeddings using hash-based approach"""
-    
+
+    def __init__(self, dim: int = 384, num_workers: int = 0, batch_size: int = 4096):
+        """
+        Args:
+            dim: Embedding dimension
+            num_workers: Worker processes used to hash large batches
+                (0 = hash in this process)
+            batch_size: Texts per worker task
+        """
+        self.dim = dim
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for documents"""
-        return [self._hash_to_vector(text) for text in texts]
+        return self._vectors(texts, self.dim).tolist()
     
     def embed_query(self, text: str) -> List[float]:
         """Generate embedding for a query"""
-        return self._hash_to_vector(text)
-    
+        return self._hash_to_vector(text, self.dim)
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts in bulk
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Contiguous float32 array of shape (len(texts), dim) with the same
+            values as embed_documents
+        """
+        return self._vectors(texts, self.dim, dtype=np.float32)
+
+    def _digests(self, texts: List[str]) -> bytes:
+        if self.num_workers and len(texts) > self.batch_size:
+            batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+            with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
+                return b"".join(pool.map(_digest_batch, batches))
+        return _digest_batch(texts)
+
+    def _vectors(self, texts: List[str], dim: int, dtype=np.float64) -> np.ndarray:
+        # Each vector is its text's 32-byte digest repeated to `dim` values,
+        # scaled to [-0.5, 0.5] and L2-normalized; normalizing the 32 distinct
+        # values (weighted by how often each repeats) before tiling keeps the
+        # work per text independent of dim
+        digests = np.frombuffer(self._digests(list(texts)), dtype=np.uint8).reshape(-1, 32)
+        columns = np.arange(dim) % digests.shape[1]
+        repeats = np.bincount(columns, minlength=digests.shape[1])
+        values = digests / 255.0 - 0.5
+        magnitude = np.sqrt((values ** 2) @ repeats)[:, None]
+        np.divide(values, magnitude, out=values, where=magnitude > 0)
+        return np.take(values.astype(dtype, copy=False), columns, axis=1)
+
     def _hash_to_vector(self, text: str, dim: int = 384) -> List[float]:
         """Convert text to vector using hash-based approach"""
-        # Create deterministic hash
-        hash_obj = hashlib.sha256(text.lower().encode())
-        hash_bytes = hash_obj.digest()
-        
-        # Expand to desired dimension
-        vector = []
-        for i in range(dim):
-            byte_idx = i % len(hash_bytes)
-            vector.append((hash_bytes[byte_idx] / 255.0) - 0.5)
-        
-        # Normalize
-        magnitude = sum(x**2 for x in vector) ** 0.5
-        if magnitude > 0:
-            vector = [x / magnitude for x in vector]
-        
-        return vector
+        return self._vectors([text], dim)[0].tolist()
 
 
-class TFIDFRetriever(BaseRetriever):
-    docs: List[Document]
-    tfidf: Any
-    matrix: Any
+def as_document(chunk: Any) -> Document:
+    """Materialize an indexed chunk (TextChunk or Document) for the caller."""
+    return chunk.to_document() if isinstance(chunk, TextChunk) else chunk
+
+
+def _as_chunk(doc: Any) -> TextChunk:
+    """Wrap a Document as a whole-text TextChunk so stores hold one chunk type."""
+    return doc if isinstance(doc, TextChunk) else TextChunk(doc.page_content, doc.metadata)
+
+
+def merge_adjacent_chunks(chunks: List[TextChunk]) -> List[TextChunk]:
+    """
+    Merge chunks of the same source text whose spans overlap or touch
+
+    Overlapping windows of one file are replaced by a single chunk spanning
+    all of them, so the shared text is only sent to the prompt once. The
+    merged chunk takes the position of its best-ranked member.
+
+    Args:
+        chunks: Chunks in rank order
+
+    Returns:
+        Merged chunks in rank order (possibly fewer than given)
+    """
+    def touches(a: TextChunk, b: TextChunk) -> bool:
+        return (
+            a.text is b.text
+            and a.chunk_start is not None and b.chunk_start is not None
+            and b.chunk_start <= a.chunk_end and a.chunk_start <= b.chunk_end
+        )
+
+    spans: List[Tuple[int, TextChunk]] = []
+    for rank, chunk in enumerate(chunks):
+        # A widened span may touch further kept chunks, so repeat until none
+        while True:
+            match = next((i for i, (_, kept) in enumerate(spans) if touches(kept, chunk)), None)
+            if match is None:
+                spans.append((rank, chunk))
+                break
+            kept_rank, kept = spans.pop(match)
+            rank = min(rank, kept_rank)
+            span = TextChunk(
+                kept.text, kept.source_metadata,
+                min(kept.chunk_start, chunk.chunk_start), max(kept.chunk_end, chunk.chunk_end)
+            )
+            span.duplicates = (kept.duplicates or []) + (chunk.duplicates or []) or None
+            chunk = span
+    return [chunk for _, chunk in sorted(spans, key=lambda item: item[0])]
+
+
+def top_k_per_row(
+    scores: sparse.csr_matrix,
+    k: int,
+    pad: bool = True
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Select the k best columns of every row of a sparse score matrix
+
+    Only stored (non-zero) scores are ranked. With pad, rows with fewer than
+    k of them are padded with the lowest-numbered zero-score columns so every
+    row returns min(k, n_columns) ids, like a dense argsort would.
+
+    Returns:
+        (column ids, scores) of every row, best first
+    """
+    scores = scores.tocsr()
+    n_cols = scores.shape[1]
+    k = min(k, n_cols)
+    results = []
+    for row in range(scores.shape[0]):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        cols, data = scores.indices[start:end], scores.data[start:end]
+        top = _top_k(data, k)
+        ids, values = cols[top], data[top]
+        if pad and len(ids) < k:
+            padding = np.setdiff1d(np.arange(min(n_cols, k + len(cols))), cols)[: k - len(ids)]
+            ids = np.concatenate([ids, padding])
+            values = np.concatenate([values, np.zeros(len(padding), dtype=values.dtype)])
+        results.append((ids, values))
+    return results
+
+
+_retrieval_pool: Optional[ThreadPoolExecutor] = None
+_retrieval_pool_lock = threading.Lock()
+# Marks the retrieval pool's own threads (see _in_retrieval_pool)
+_pool_thread = threading.local()
+# Event loop -> collection name -> semaphore; asyncio primitives belong to one loop
+_loop_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Any, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _mark_pool_thread() -> None:
+    _pool_thread.active = True
+
+
+def _in_retrieval_pool() -> bool:
+    return getattr(_pool_thread, "active", False)
+
+
+def _get_retrieval_pool() -> ThreadPoolExecutor:
+    """
+    Bounded thread pool (Config.RETRIEVAL_THREADS) shared by retrieval work
+
+    Runs async retrievals off the event loop and the dense leg of large
+    hybrid queries. Work already running on the pool never waits on it.
+    """
+    global _retrieval_pool
+    with _retrieval_pool_lock:
+        if _retrieval_pool is None:
+            _retrieval_pool = ThreadPoolExecutor(
+                max_workers=max(1, Config.RETRIEVAL_THREADS),
+                thread_name_prefix="retrieval",
+                initializer=_mark_pool_thread,
+            )
+        return _retrieval_pool
+
+
+def _collection_semaphore(collection: Any) -> asyncio.Semaphore:
+    """Per-loop semaphore capping in-flight async searches of one collection."""
+    semaphores = _loop_semaphores.setdefault(asyncio.get_running_loop(), {})
+    semaphore = semaphores.get(collection)
+    if semaphore is None:
+        semaphore = semaphores[collection] = asyncio.Semaphore(max(1, Config.RETRIEVAL_CONCURRENCY))
+    return semaphore
+
+
+async def run_retrieval(collection: Any, func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a blocking retrieval call on the retrieval pool
+
+    The sparse products and sorts behind a search release the GIL, so the
+    event loop stays responsive while several searches run in parallel.
+
+    Args:
+        collection: Collection name the concurrency limit applies to
+        func: Blocking callable
+        *args: Arguments for func
+
+    Returns:
+        The result of func
+    """
+    async with _collection_semaphore(collection):
+        return await asyncio.get_running_loop().run_in_executor(_get_retrieval_pool(), func, *args)
+
+
+class CachedRetriever(BaseRetriever):
+    """
+    Retriever whose results go through an optional RetrievalCache
+
+    Subclasses implement _search (and may batch _search_many); cache_scope
+    identifies the index searched (collection name, index version, ...).
+    BaseRetriever's metaclass derives from ABCMeta, so a subclass missing
+    _search fails at instantiation.
+    """
+
     top_k: int = 5
+    cache: Any = None
+    cache_scope: Any = None
 
     class Config:
         arbitrary_types_allowed = True
 
+    @abstractmethod
+    def _search(self, query: str, k: int) -> List[Document]:
+        """Retrieve the top k documents for one query, bypassing the cache."""
+
+    def _search_many(self, queries: List[str], k: int) -> List[List[Document]]:
+        return [self._search(query, k) for query in queries]
+
     def _get_relevant_documents(self, query: str) -> List[Document]:
-        q_vec = self.tfidf.transform([query])
-        sims = cosine_similarity(q_vec, self.matrix)[0]
-        idxs = sims.argsort()[::-1][: self.top_k]
-        return [self.docs[i] for i in idxs]
+        if self.cache is None:
+            return self._search(query, self.top_k)
+        return self.cache.get_or_compute(
+            self.cache_scope, query, self.top_k, lambda: self._search(query, self.top_k)
+        )
+
+    @property
+    def _collection(self) -> Any:
+        return self.cache_scope[0] if self.cache_scope else None
 
     async def _aget_relevant_documents(self, query: str) -> List[Document]:
-        return self._get_relevant_documents(query)
+        # Cache lookups are cheap enough for the loop; searches go to the pool
+        if self.cache is None:
+            return await run_retrieval(self._collection, self._search, query, self.top_k)
+        key = self.cache.key(self.cache_scope, query, self.top_k)
+        documents = self.cache.get(key)
+        if documents is None:
+            documents = await run_retrieval(self._collection, self._search, query, self.top_k)
+            self.cache.put(key, documents)
+        return documents
+
+    async def aretrieve_batch(self, queries: List[str], k: Optional[int] = None) -> List[List[Document]]:
+        """Async retrieve_batch: the whole batch runs as one job on the retrieval pool."""
+        return await run_retrieval(self._collection, self.retrieve_batch, queries, k)
+
+    def retrieve_batch(self, queries: List[str], k: Optional[int] = None) -> List[List[Document]]:
+        """
+        Retrieve documents for many queries
+
+        Cached queries are answered from the cache; the rest are searched
+        together with _search_many.
+
+        Args:
+            queries: Query texts
+            k: Documents per query (defaults to top_k)
+
+        Returns:
+            One document list per query, in query order
+        """
+        k = k or self.top_k
+        if self.cache is None:
+            return self._search_many(queries, k) if queries else []
+        keys = [self.cache.key(self.cache_scope, query, k) for query in queries]
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, docs in enumerate(results) if docs is None]
+        if missing:
+            for i, docs in zip(missing, self._search_many([queries[i] for i in missing], k)):
+                self.cache.put(keys[i], docs)
+                results[i] = docs
+        return results
+
+
+class TFIDFRetriever(CachedRetriever):
+    # Indexed chunks (TextChunk views); only the top-k are materialized
+    docs: List[Any]
+    tfidf: Any
+    matrix: Any
+    # Compiled QueryEncoder of tfidf (None = use tfidf.transform)
+    encoder: Any = None
+
+    def _search(self, query: str, k: int) -> List[Document]:
+        if self.encoder is not None:
+            idxs = _top_k(self.encoder.scores(query), k)
+        else:
+            q_vec = self.tfidf.transform([query])
+            sims = cosine_similarity(q_vec, self.matrix)[0]
+            idxs = sims.argsort()[::-1][:k]
+        return [as_document(self.docs[i]) for i in idxs]
+
+    def _search_many(self, queries: List[str], k: int) -> List[List[Document]]:
+        # Query and chunk rows are L2-normalized by the vectorizer, so Q·Mᵀ
+        # holds the cosine similarities of every (query, chunk) pair
+        scores = self.tfidf.transform(queries) @ self.matrix.T
+        return [
+            [as_document(self.docs[i]) for i in idxs]
+            for idxs, _ in top_k_per_row(scores, k)
+        ]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a term-major inverted index
+
+    Postings are stored as a CSR matrix with one row per term whose values
+    are precomputed per-(term, chunk) impact scores, so a query only reads
+    the postings of its own terms and never touches the rest of the corpus.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocabulary: Dict[str, int] = {}
+        self.postings = None
+        self.n_docs = 0
+        self._analyzer = CountVectorizer().build_analyzer()
+
+    def fit(self, texts: Iterable[str]) -> "BM25Index":
+        """Build the inverted index from chunk texts (consumed in one pass)."""
+        vectorizer = CountVectorizer()
+        counts = vectorizer.fit_transform(texts).tocsr().astype(np.float32)
+        n_docs, n_terms = counts.shape
+        doc_len = np.asarray(counts.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() if n_docs else 1.0
+        df = np.bincount(counts.indices, minlength=n_terms)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        rows = np.repeat(np.arange(n_docs), np.diff(counts.indptr))
+        tf = counts.data
+        norm = self.k1 * (1 - self.b + self.b * doc_len[rows] / (avg_len or 1.0))
+        impact = idf[counts.indices] * tf * (self.k1 + 1) / (tf + norm)
+
+        doc_major = sparse.csr_matrix((impact.astype(np.float32), counts.indices, counts.indptr), shape=counts.shape)
+        self.postings = doc_major.T.tocsr()
+        self.postings.sort_indices()
+        self.vocabulary = vectorizer.vocabulary_
+        self.n_docs = n_docs
+        return self
+
+    def search(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score only the chunks in the query terms' postings
+
+        Args:
+            query: Query text
+            k: Number of results
+
+        Returns:
+            Tuple of (row ids, scores) sorted by descending score; may hold
+            fewer than k rows when few chunks contain any query term
+        """
+        doc_ids, weights = self._postings(query)
+        if not len(doc_ids) or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        candidates, inverse = np.unique(doc_ids, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+        top = _top_k(scores, k)
+        return candidates[top], scores[top]
+
+    def _postings(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(chunk id, weighted impact) pairs from the postings of the query terms."""
+        query_terms = Counter(self._analyzer(query))
+        term_ids = [(self.vocabulary[t], n) for t, n in query_terms.items() if t in self.vocabulary]
+        if not term_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        indptr, indices, data = self.postings.indptr, self.postings.indices, self.postings.data
+        doc_ids = np.concatenate([indices[indptr[t]:indptr[t + 1]] for t, _ in term_ids])
+        weights = np.concatenate([data[indptr[t]:indptr[t + 1]] * n for t, n in term_ids])
+        return doc_ids, weights
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every chunk (zero for chunks without a query term)."""
+        doc_ids, weights = self._postings(query)
+        return np.bincount(doc_ids, weights=weights, minlength=self.n_docs)
+
+    def to_state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        terms_buf, terms_offsets = pack_strings(terms)
+        arrays = {
+            "bm25_indptr": self.postings.indptr,
+            "bm25_indices": self.postings.indices,
+            "bm25_data": self.postings.data,
+            "bm25_terms_buf": terms_buf,
+            "bm25_terms_offsets": terms_offsets,
+        }
+        return arrays, {"k1": self.k1, "b": self.b, "n_docs": self.n_docs}
+
+    @classmethod
+    def from_state(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> "BM25Index":
+        index = cls(k1=meta["k1"], b=meta["b"])
+        terms = unpack_strings(arrays["bm25_terms_buf"], arrays["bm25_terms_offsets"])
+        index.vocabulary = {term: i for i, term in enumerate(terms)}
+        index.n_docs = meta["n_docs"]
+        index.postings = sparse.csr_matrix(
+            (arrays["bm25_data"], arrays["bm25_indices"], arrays["bm25_indptr"]),
+            shape=(len(terms), index.n_docs),
+        )
+        return index
+
+
+class BM25Retriever(CachedRetriever):
+    # Indexed chunks (TextChunk views); only the top-k are materialized
+    docs: List[Any]
+    index: Any
+
+    def _search(self, query: str, k: int) -> List[Document]:
+        idxs, _ = self.index.search(query, k)
+        return [as_document(self.docs[i]) for i in idxs]
+
+
+class HashingTfidf:
+    """
+    TF-IDF encoder over hashed features with streaming document frequencies
+
+    Terms are hashed into a fixed number of columns, so there is no vocabulary
+    to fit or cap. The encoder keeps the raw term counts and per-column
+    document frequencies; appending or removing chunks only hashes the new
+    texts and re-weights the stored counts with the updated IDF.
+    """
+
+    def __init__(self, n_features: int = 2 ** 20):
+        self.n_features = n_features
+        self._hasher = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+        self.counts = sparse.csr_matrix((0, n_features))
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self.idf_ = np.ones(n_features)
+        self.matrix = self.counts
+
+    def term_counts(self, texts: Iterable[str]) -> sparse.csr_matrix:
+        """Raw hashed term counts, one row per text."""
+        counts = self._hasher.transform(texts).tocsr()
+        counts.sum_duplicates()
+        return counts
+
+    def document_frequency(self, counts: sparse.csr_matrix) -> np.ndarray:
+        """Number of rows of a count matrix that use each column."""
+        return np.bincount(counts.indices, minlength=self.n_features)
+
+    def _derive(self, counts: sparse.csr_matrix, df: np.ndarray) -> "HashingTfidf":
+        encoder = copy.copy(self)
+        encoder.counts, encoder.df = counts, df
+        encoder.idf_ = encoder.smoothed_idf(df, counts.shape[0])
+        encoder.matrix = encoder.weight(counts)
+        return encoder
+
+    @staticmethod
+    def smoothed_idf(df: np.ndarray, n_docs: int) -> np.ndarray:
+        """Same smoothed IDF as TfidfVectorizer."""
+        return np.log((1 + n_docs) / (1 + df)) + 1
+
+    def weight(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        """L2-normalized TF-IDF rows of a count matrix under this encoder's IDF."""
+        weighted = counts.astype(np.float64, copy=True)
+        weighted.data *= self.idf_[weighted.indices]
+        return normalize(weighted, copy=False)
+
+    def fit(self, texts: Iterable[str]) -> "HashingTfidf":
+        """Return an encoder fitted on the texts (consumed in one pass)."""
+        counts = self.term_counts(texts)
+        return self._derive(counts, self.document_frequency(counts))
+
+    def append(self, texts: Iterable[str]) -> "HashingTfidf":
+        """Return a new encoder with the texts appended as extra rows."""
+        texts = list(texts)
+        if not texts:
+            return self
+        added = self.term_counts(texts)
+        return self._derive(
+            sparse.vstack([self.counts, added], format="csr"),
+            self.df + self.document_frequency(added),
+        )
+
+    def remove(self, keep: np.ndarray) -> "HashingTfidf":
+        """Return a new encoder holding only the rows where ``keep`` is True."""
+        if keep.all():
+            return self
+        return self._derive(
+            self.counts[keep],
+            self.df - self.document_frequency(self.counts[~keep]),
+        )
+
+    def transform(self, texts: Iterable[str]) -> sparse.csr_matrix:
+        return self.weight(self.term_counts(texts))
+
+    def to_state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        arrays = {
+            "hash_counts_data": self.counts.data,
+            "hash_counts_indices": self.counts.indices,
+            "hash_counts_indptr": self.counts.indptr,
+        }
+        return arrays, {"n_features": self.n_features, "n_docs": self.counts.shape[0]}
+
+    @classmethod
+    def from_state(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> "HashingTfidf":
+        encoder = cls(n_features=meta["n_features"])
+        counts = sparse.csr_matrix(
+            (arrays["hash_counts_data"], arrays["hash_counts_indices"], arrays["hash_counts_indptr"]),
+            shape=(meta["n_docs"], meta["n_features"]),
+        )
+        # Document frequencies are implied by the counts; no need to store them
+        return encoder._derive(counts, encoder.document_frequency(counts))
+
+
+_HASHED_TERM_CACHE_SIZE = 65536
+
+
+class QueryEncoder:
+    """
+    Precompiled TF-IDF query encoder with an optional term-major scoring kernel
+
+    For a short query, sklearn's transform spends most of its time on input
+    validation, analyzer setup and sparse matrix construction. The encoder
+    keeps only the token regex, the term -> column lookup (vocabulary dict
+    or feature hash) and the IDF, and scores against the L2-normalized chunk
+    matrix it shares with the store. With ``postings`` it also keeps that
+    matrix transposed to one postings row per term, so a full-corpus query
+    only reads the postings of its own terms; the postings are a second
+    copy of the matrix, so they are opt-in.
+    """
+
+    def __init__(
+        self,
+        token_pattern: str,
+        lowercase: bool,
+        lookup: Callable[[str], Optional[Tuple[int, float]]],
+        n_features: int,
+        matrix: sparse.csr_matrix,
+        postings: bool = False
+    ):
+        """
+        Args:
+            token_pattern: Vectorizer token regex
+            lowercase: Whether the vectorizer lowercases text
+            lookup: (column, IDF) of a term (None for out-of-vocabulary terms)
+            n_features: Number of columns
+            matrix: L2-normalized (chunks x columns) CSR TF-IDF matrix (shared)
+            postings: Also keep a term-major copy of the matrix
+        """
+        self._findall = re.compile(token_pattern).findall
+        self._lowercase = lowercase
+        self._lookup = lookup
+        self.n_features = n_features
+        self._matrix = matrix
+        self.n_docs = matrix.shape[0]
+        self._postings = matrix.T.tocsr() if postings else None
+        # Per-thread dense query vector, zeroed again after every query
+        self._local = threading.local()
+
+    @classmethod
+    def compile(
+        cls,
+        tfidf: Any,
+        matrix: sparse.csr_matrix,
+        postings: bool = False
+    ) -> Optional["QueryEncoder"]:
+        """
+        Build the encoder of a fitted TfidfVectorizer or HashingTfidf
+
+        Args:
+            tfidf: Fitted vectorizer
+            matrix: Its L2-normalized CSR chunk matrix
+            postings: Keep a term-major copy of the matrix (see class docstring)
+
+        Returns:
+            The encoder, or None when the vectorizer's settings (n-grams,
+            stop words, custom analyzers, ...) are not reproduced by it
+        """
+        if isinstance(tfidf, HashingTfidf):
+            params = tfidf._hasher.get_params()
+            supported = not params["alternate_sign"] and params["norm"] is None
+            n_features, idf = tfidf.n_features, tfidf.idf_
+
+            # Memoized per encoder; a rebuilt index compiles a new encoder
+            @lru_cache(maxsize=_HASHED_TERM_CACHE_SIZE)
+            def lookup(term: str) -> Tuple[int, float]:
+                # Same column as HashingVectorizer: |signed murmurhash3| mod n_features
+                column = abs(murmurhash3_32(term, seed=0)) % n_features
+                return column, float(idf[column])
+        else:
+            params = tfidf.get_params()
+            supported = (
+                params["norm"] == "l2" and params["use_idf"] and not params["sublinear_tf"]
+                and getattr(tfidf, "idf_", None) is not None
+            )
+            if supported:
+                n_features, idf = len(tfidf.idf_), tfidf.idf_.tolist()
+                lookup = {term: (column, idf[column]) for term, column in tfidf.vocabulary_.items()}.get
+        supported = supported and (
+            params["analyzer"] == "word" and tuple(params["ngram_range"]) == (1, 1)
+            and params["stop_words"] is None and params["tokenizer"] is None
+            and params["preprocessor"] is None and params["strip_accents"] is None
+            and not params["binary"]
+        )
+        if not supported:
+            return None
+        return cls(params["token_pattern"], params["lowercase"], lookup, n_features, matrix, postings)
+
+    def _weights(self, query: str) -> Dict[int, float]:
+        # Plain Python floats: for a handful of terms NumPy call overhead
+        # would dominate the arithmetic
+        weights: Dict[int, float] = {}
+        lookup = self._lookup
+        for token in self._findall(query.lower() if self._lowercase else query):
+            entry = lookup(token)
+            if entry is not None:
+                column, idf = entry
+                weights[column] = weights.get(column, 0.0) + idf
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        if norm:
+            weights = {column: w / norm for column, w in weights.items()}
+        return weights
+
+    def encode(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(sorted column ids, L2-normalized TF-IDF weights) of a query."""
+        weights = self._weights(query)
+        ids = sorted(weights)
+        return np.array(ids, dtype=np.int64), np.array([weights[i] for i in ids], dtype=np.float64)
+
+    def transform(self, query: str) -> sparse.csr_matrix:
+        """One-row sparse TF-IDF vector of a query, like vectorizer.transform([query])."""
+        ids, weights = self.encode(query)
+        return sparse.csr_matrix((weights, ids, [0, len(ids)]), shape=(1, self.n_features))
+
+    def scores(self, query: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Cosine similarity of chunks to a query
+
+        Args:
+            query: Query text
+            rows: Row ids to score (None = every chunk); only these rows of
+                the matrix are read
+
+        Returns:
+            One score per scored row, aligned with rows
+        """
+        weights = self._weights(query)
+        if rows is None and self._postings is not None:
+            scores = np.zeros(self.n_docs)
+            postings = self._postings
+            for column, weight in weights.items():
+                start, end = postings.indptr[column], postings.indptr[column + 1]
+                # Columns of one postings row are unique, so fancy += is exact
+                scores[postings.indices[start:end]] += weight * postings.data[start:end]
+            return scores
+        query_vector = getattr(self._local, "query_vector", None)
+        if query_vector is None:
+            query_vector = self._local.query_vector = np.zeros(self.n_features)
+        columns = list(weights)
+        query_vector[columns] = list(weights.values())
+        try:
+            matrix = self._matrix if rows is None else self._matrix[rows]
+            # CSR matrix times a dense vector is one pass over the stored values
+            return matrix @ query_vector
+        finally:
+            query_vector[columns] = 0.0
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first."""
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def exact_search(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """
+    Brute-force inner-product search (the reference for IVFIndex)
+
+    Args:
+        vectors: (n, dim) array of indexed vectors
+        queries: (m, dim) array of query vectors
+        k: Neighbours per query
+
+    Returns:
+        (m, min(k, n)) array of row ids, best first
+    """
+    scores = np.atleast_2d(queries) @ vectors.T
+    return np.stack([_top_k(row, k) for row in scores])
+
+
+QUANTIZATIONS = ("none", "float16", "int8")
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index for dense vectors
+
+    Vectors are assigned to the nearest of ``n_lists`` k-means centroids and
+    stored grouped by list, so each list is one contiguous block. A query
+    scores the centroids, scans only the ``nprobe`` best lists and ranks
+    those vectors by inner product (cosine for L2-normalized vectors).
+    Raising ``nprobe`` trades latency for recall; nprobe == n_lists is exact.
+
+    Vectors can be stored quantized ("float16", or "int8" with one scale per
+    vector) to cut memory 2-4x. Candidates are then scored on the quantized
+    codes, and when the caller can supply full-precision vectors the best
+    ``k * rescore_factor`` candidates are rescored exactly.
+    """
+
+    def __init__(
+        self,
+        n_lists: Optional[int] = None,
+        nprobe: int = 8,
+        n_iter: int = 10,
+        seed: int = 0,
+        quantization: str = "none",
+        rescore_factor: int = 4
+    ):
+        """
+        Args:
+            n_lists: Number of k-means lists (default: about sqrt(n))
+            nprobe: Lists scanned per query
+            n_iter: k-means iterations
+            seed: Seed for centroid initialization and training sample
+            quantization: "none" (float32), "float16" or "int8"
+            rescore_factor: Candidates per result rescored in full precision
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor
+        self.centroids: Optional[np.ndarray] = None
+        # Stored vectors (quantized codes unless quantization == "none")
+        self.vectors: Optional[np.ndarray] = None
+        # Per-vector dequantization scales (int8 only)
+        self.scales: Optional[np.ndarray] = None
+        self.ids: Optional[np.ndarray] = None
+        self.offsets: Optional[np.ndarray] = None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the stored vectors and their scales."""
+        return self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def _quantize(self, vectors: np.ndarray) -> None:
+        if self.quantization == "float16":
+            self.vectors = vectors.astype(np.float16)
+        elif self.quantization == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self.vectors = np.round(vectors / scales[:, None]).astype(np.int8)
+            self.scales = scales.astype(np.float32)
+        else:
+            self.vectors = vectors
+
+    def _block_scores(self, start: int, end: int, query: np.ndarray) -> np.ndarray:
+        block = self.vectors[start:end]
+        if self.quantization == "none":
+            return block @ query
+        scores = block.astype(np.float32) @ query
+        if self.scales is not None:
+            scores *= self.scales[start:end]
+        return scores
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 65536) -> np.ndarray:
+        # Batched so the (batch, n_lists) score block stays small
+        return np.concatenate([
+            (vectors[i:i + batch_size] @ centroids.T).argmax(axis=1)
+            for i in range(0, len(vectors), batch_size)
+        ]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+    def fit(self, vectors: np.ndarray) -> "IVFIndex":
+        """
+        Train the coarse quantizer and bucket the vectors
+
+        Args:
+            vectors: (n, dim) array; rows should be L2-normalized
+
+        Returns:
+            This index
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n = len(vectors)
+        n_lists = max(1, min(self.n_lists or int(np.sqrt(n)), n))
+        rng = np.random.default_rng(self.seed)
+        # Spherical k-means on a sample is enough for the coarse quantizer
+        sample_size = min(n, n_lists * 64)
+        sample = vectors[rng.choice(n, sample_size, replace=False)] if sample_size < n else vectors
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(self.n_iter):
+            assign = self._assign(sample, centroids)
+            one_hot = sparse.csr_matrix(
+                (np.ones(len(sample), dtype=np.float32), (assign, np.arange(len(sample)))),
+                shape=(n_lists, len(sample)),
+            )
+            sums = np.asarray(one_hot @ sample)
+            counts = np.bincount(assign, minlength=n_lists)
+            empty = counts == 0
+            # Re-seed empty lists with random sample points
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+
+        assign = self._assign(vectors, centroids)
+        order = np.argsort(assign, kind="stable")
+        self.n_lists = n_lists
+        self.centroids = centroids.astype(np.float32)
+        self._quantize(vectors[order])
+        self.ids = order.astype(np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))]).astype(np.int64)
+        return self
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        rescore: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k inner-product search
+
+        Args:
+            queries: (m, dim) array, or a single (dim,) vector
+            k: Neighbours per query
+            nprobe: Lists to scan (defaults to the index's nprobe)
+            rescore: For quantized indexes, returns full-precision vectors
+                for an array of ids; the shortlisted candidates are then
+                re-ranked on exact scores
+
+        Returns:
+            Tuple of (ids, scores), each (m, k) and best first; slots with
+            no candidate hold id -1 and score -inf
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = max(1, min(nprobe or self.nprobe, self.n_lists))
+        rescore = rescore if self.quantization != "none" else None
+        shortlist = k * self.rescore_factor if rescore is not None else k
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for row, (query, lists) in enumerate(zip(queries, probes)):
+            blocks = [(self.offsets[l], self.offsets[l + 1]) for l in lists]
+            rows = np.concatenate([np.arange(start, end) for start, end in blocks])
+            if not len(rows):
+                continue
+            block_scores = np.concatenate([self._block_scores(start, end, query) for start, end in blocks])
+            top = _top_k(block_scores, shortlist)
+            candidates, candidate_scores = self.ids[rows[top]], block_scores[top]
+            if rescore is not None:
+                candidate_scores = np.asarray(rescore(candidates), dtype=np.float32) @ query
+                best = _top_k(candidate_scores, k)
+                candidates, candidate_scores = candidates[best], candidate_scores[best]
+            ids[row, :len(candidates)] = candidates[:k]
+            scores[row, :len(candidates)] = candidate_scores[:k]
+        return ids, scores
+
+    def to_state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        arrays = {
+            "ivf_centroids": self.centroids,
+            "ivf_vectors": self.vectors,
+            "ivf_ids": self.ids,
+            "ivf_offsets": self.offsets,
+        }
+        if self.scales is not None:
+            arrays["ivf_scales"] = self.scales
+        meta = {
+            "n_lists": self.n_lists,
+            "nprobe": self.nprobe,
+            "n_iter": self.n_iter,
+            "seed": self.seed,
+            "quantization": self.quantization,
+            "rescore_factor": self.rescore_factor,
+        }
+        return arrays, meta
+
+    @classmethod
+    def from_state(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> "IVFIndex":
+        index = cls(**meta)
+        index.centroids = arrays["ivf_centroids"]
+        index.vectors = arrays["ivf_vectors"]
+        index.scales = arrays.get("ivf_scales")
+        index.ids = arrays["ivf_ids"]
+        index.offsets = arrays["ivf_offsets"]
+        return index
+
+
+class LSAIndex:
+    """
+    Dense chunk vectors from a truncated SVD of the TF-IDF matrix
+
+    Chunks and queries are projected onto the top singular directions
+    (latent semantic analysis), where chunks whose vocabulary co-occurs end
+    up close even when they do not share the query's exact terms. Only the
+    columns some chunk uses are decomposed, so hashed feature spaces with
+    millions of mostly empty columns stay small, and the SVD is fitted on a
+    sample of at most sample_size chunks before every chunk is projected.
+    Stores too small to decompose (fewer than two chunks or terms) get no
+    latent dimensions at all; see n_dims. ``vectors`` may be dropped (None)
+    when only a quantized IVF index needs them; project recomputes any rows.
+    """
+
+    def __init__(self, n_components: int = 128, sample_size: int = 8192, seed: int = 0):
+        self.n_components = n_components
+        self.sample_size = sample_size
+        self.seed = seed
+        self.columns = np.empty(0, dtype=np.int64)
+        self.components = np.empty((0, 0), dtype=np.float32)
+        self.vectors: Optional[np.ndarray] = np.empty((0, 0), dtype=np.float32)
+
+    def fit(self, matrix: sparse.spmatrix) -> "LSAIndex":
+        """Decompose an L2-normalized (chunks x terms) TF-IDF matrix."""
+        matrix = matrix.tocsr()
+        self.columns = np.unique(matrix.indices)
+        reduced = matrix[:, self.columns]
+        sample = reduced
+        if reduced.shape[0] > self.sample_size:
+            rng = np.random.default_rng(self.seed)
+            sample = reduced[np.sort(rng.choice(reduced.shape[0], self.sample_size, replace=False))]
+        n_components = min(self.n_components, min(sample.shape) - 1)
+        if n_components < 1:
+            self.components = np.zeros((0, len(self.columns)), dtype=np.float32)
+            self.vectors = np.zeros((matrix.shape[0], 0), dtype=np.float32)
+            return self
+        # Identical sample rows have zero total variance; the explained
+        # variance ratio (unused here) then divides by zero
+        with np.errstate(divide="ignore", invalid="ignore"):
+            svd = TruncatedSVD(n_components=n_components, random_state=self.seed).fit(sample)
+        self.components = svd.components_.astype(np.float32)
+        self.vectors = self._project(reduced)
+        return self
+
+    def _project(self, reduced: sparse.spmatrix) -> np.ndarray:
+        return normalize(np.asarray(reduced @ self.components.T, dtype=np.float32))
+
+    def project(self, matrix: sparse.spmatrix) -> np.ndarray:
+        """Unit latent vectors of TF-IDF chunk rows (the same values as ``vectors``)."""
+        return self._project(matrix.tocsr()[:, self.columns])
+
+    @property
+    def n_dims(self) -> int:
+        """Latent dimensions fitted (0 when the matrix was too small to decompose)."""
+        return self.components.shape[0]
+
+    def transform(self, queries: sparse.spmatrix) -> np.ndarray:
+        """Project TF-IDF query rows into the latent space (unit rows)."""
+        if not self.n_dims:
+            return np.zeros((queries.shape[0], 0), dtype=np.float32)
+        projected = queries.tocsr()[:, self.columns] @ self.components.T
+        return normalize(np.asarray(projected, dtype=np.float32))
+
+    def scores(self, queries: sparse.spmatrix, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine similarity of every chunk (or of the given rows) to one TF-IDF query row."""
+        vectors = self.vectors if rows is None else self.vectors[rows]
+        return vectors @ self.transform(queries)[0]
+
+    def to_state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        arrays = {
+            "lsa_columns": self.columns,
+            "lsa_components": self.components,
+        }
+        if self.vectors is not None:
+            arrays["lsa_vectors"] = self.vectors
+        return arrays, {"n_components": self.n_components, "sample_size": self.sample_size, "seed": self.seed}
+
+    @classmethod
+    def from_state(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> "LSAIndex":
+        index = cls(**meta)
+        index.columns = arrays["lsa_columns"]
+        index.components = arrays["lsa_components"]
+        index.vectors = arrays.get("lsa_vectors")
+        return index
+
+
+def reciprocal_rank_fusion(score_arrays: Iterable[np.ndarray], c: int = 60) -> np.ndarray:
+    """
+    Fuse per-chunk scores of several retrievers by reciprocal rank
+
+    Every retriever adds 1 / (c + rank) to each chunk it scores above zero
+    (rank starting at 1), so the fused order only depends on ranks and the
+    legs' score scales never have to be calibrated against each other.
+
+    Args:
+        score_arrays: One score array per retriever, aligned by chunk row
+        c: Rank offset damping the weight of the very first ranks
+
+    Returns:
+        Fused score of every chunk
+    """
+    fused = None
+    for scores in score_arrays:
+        if fused is None:
+            fused = np.zeros(len(scores))
+        # Only chunks the leg actually matched are ranked
+        candidates = np.flatnonzero(scores > 0)
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        fused[order] += 1.0 / (c + 1 + np.arange(len(order)))
+    return fused
+
+
+# Hybrid queries over at least this many rows score their dense leg on the
+# retrieval pool next to the lexical leg (NumPy and SciPy release the GIL);
+# small stores are cheaper to score inline
+_PARALLEL_LEGS_MIN_ROWS = 20000
+
+RETRIEVER_BACKENDS = ("tfidf", "bm25")
+VECTOR_STORE_TYPES = ("tfidf",) + tuple(PERSISTENT_STORES)
+VECTORIZERS = ("tfidf", "hashing")
+SEARCH_TYPES = ("similarity", "mmr")
+_DEFAULT_SEARCH = {"search_type": "similarity", "merge_adjacent": False}
+_SCORE_CACHE_SIZE = 8
+# Filtered searches score only their rows when these are at most this share
+# of the store; larger subsets reuse the memoized full score vector
+_SUBSET_SCORING_MAX_SHARE = 0.25
+# Process-wide counter; every fit, patch or backend switch gets a new version
+_INDEX_VERSIONS = count(1)
+
+
+def next_index_version() -> int:
+    """New process-wide index version (retrieval cache scopes key on it)."""
+    return next(_INDEX_VERSIONS)
+
+
+def _search_options(search_kwargs: Optional[dict], search_type: Optional[str]) -> Dict[str, Any]:
+    """Keyword arguments for SimpleVectorStore.search from as_retriever arguments and Config."""
+    search_kwargs = search_kwargs or {}
+    options = {
+        "search_type": search_type or Config.RETRIEVAL_SEARCH_TYPE,
+        "merge_adjacent": search_kwargs.get("merge_adjacent", Config.MERGE_ADJACENT_CHUNKS),
+    }
+    if options["search_type"] not in SEARCH_TYPES:
+        raise ValueError(f"Unsupported search type: {options['search_type']}")
+    if options["search_type"] == "mmr":
+        options["fetch_k"] = search_kwargs.get("fetch_k", Config.MMR_FETCH_K)
+        options["lambda_mult"] = search_kwargs.get("lambda_mult", Config.MMR_LAMBDA)
+    if search_kwargs.get("filter"):
+        options["filter"] = search_kwargs["filter"]
+    return options
+
+
+def _options_scope(options: Dict[str, Any]) -> Tuple:
+    """Hashable form of search options for retrieval cache scopes."""
+    return tuple(
+        (key, json.dumps(value, sort_keys=True, default=str) if isinstance(value, dict) else value)
+        for key, value in sorted(options.items())
+    )
 
 
 class SimpleVectorStore:
-    def __init__(self, documents: List[Document], embeddings: SimpleEmbeddings):
-        self.documents = documents
+    def __init__(
+        self,
+        documents: Iterable[Document],
+        embeddings: SimpleEmbeddings,
+        manifest: Optional[Dict[str, Dict]] = None,
+        backend: str = "tfidf",
+        vectorizer: str = "tfidf",
+        dense_index: bool = False,
+        hybrid: bool = False,
+        build_params: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            documents: Chunks to index; may be a lazy iterator (for example
+                DocumentLoader.stream_chunks), which is consumed in one pass
+            embeddings: Embeddings instance to attach
+            manifest: Per-file fingerprints the chunks were built from
+                (see DocumentLoader.build_manifest)
+            backend: Retriever returned by as_retriever: "tfidf" (cosine over
+                the TF-IDF matrix) or "bm25" (inverted index)
+            vectorizer: "tfidf" (fitted vocabulary, capped at 4096 terms) or
+                "hashing" (hashed features that can be appended to without
+                refitting; see HashingTfidf)
+            dense_index: Also keep an IVFIndex over the chunks' LSA vectors
+                for dense_search
+            hybrid: Rank chunks by reciprocal-rank fusion of the backend's
+                lexical scores and LSA (dense) similarities; see LSAIndex
+            build_params: Loader and dedup settings the chunks were built
+                with (see VectorStoreManager.build_params)
+        """
+        if backend not in RETRIEVER_BACKENDS:
+            raise ValueError(f"Unsupported retriever backend: {backend}")
+        if vectorizer not in VECTORIZERS:
+            raise ValueError(f"Unsupported vectorizer: {vectorizer}")
         self.embeddings = embeddings
-        self._tfidf = TfidfVectorizer(max_features=4096)
-        self._matrix = self._tfidf.fit_transform([d.page_content for d in documents])
+        self.manifest = manifest
+        self.build_params = build_params
+        self.backend = backend
+        self.vectorizer = vectorizer
+        self.dense_index = dense_index
+        self.hybrid = hybrid
+        self._bm25: Optional[BM25Index] = None
+        self._ivf: Optional[IVFIndex] = None
+        self._lsa: Optional[LSAIndex] = None
+        # Set by VectorStoreManager when the store is registered
+        self.collection_name: Optional[str] = None
+        self.cache: Optional[RetrievalCache] = None
+        self._fit(documents)
+
+    def _fit(self, documents: Iterable[Document]) -> None:
+        # Feed texts to the vectorizer as they arrive instead of building a
+        # second list of every chunk text next to the chunks themselves
+        kept: List[TextChunk] = []
+
+        def texts():
+            for doc in documents:
+                chunk = _as_chunk(doc)
+                kept.append(chunk)
+                yield chunk.page_content
+
+        if self.vectorizer == "hashing":
+            tfidf = HashingTfidf(n_features=Config.HASHING_N_FEATURES).fit(texts())
+            matrix = tfidf.matrix
+        else:
+            tfidf = TfidfVectorizer(max_features=4096)
+            matrix = tfidf.fit_transform(texts())
+        self.documents, self._tfidf, self._matrix = kept, tfidf, matrix
+        self._build_side_indexes()
+
+    def _build_side_indexes(self) -> None:
+        """(Re)build the optional indexes derived from self.documents."""
+        self._query_encoder = QueryEncoder.compile(self._tfidf, self._matrix, Config.QUERY_POSTINGS)
+        self._bm25 = None
+        if self.backend == "bm25":
+            self._build_bm25()
+        self._lsa = None
+        if self.hybrid or self.dense_index:
+            self._fit_lsa()
+        self._ivf = None
+        if self.dense_index:
+            self.build_dense_index()
+        self._index_metadata()
+
+    def _index_metadata(self) -> None:
+        """Build the metadata index behind search filters and domain views."""
+        self._metadata = MetadataIndex(self.documents)
+        self._rows_cache: Dict[Tuple[str, ...], np.ndarray] = {}
+        self._reset_caches()
+
+    def _reset_caches(self) -> None:
+        """Start a new index version; called whenever search results can change."""
+        self.version = next_index_version()
+        # Score vectors of the last few queries, so domain views queried
+        # with the same text (multi-domain queries) share one scoring pass
+        self._score_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._score_lock = threading.Lock()
+
+    @property
+    def domains(self) -> List[str]:
+        return self._metadata.values("domain")
+
+    def _rows_for(self, domains: Tuple[str, ...]) -> np.ndarray:
+        rows = self._rows_cache.get(domains)
+        if rows is None:
+            rows = self._metadata.rows({"domain": {"$in": list(domains)}})
+            self._rows_cache[domains] = rows
+        return rows
+
+    def _select_rows(
+        self,
+        domains: Optional[Iterable[str]],
+        filter: Optional[Dict[str, Any]]
+    ) -> Optional[np.ndarray]:
+        """Sorted row ids allowed by the domains and metadata filter (None = all rows)."""
+        rows = None if domains is None else self._rows_for(tuple(sorted(domains)))
+        if filter:
+            selected = self._metadata.rows(filter)
+            rows = selected if rows is None else np.intersect1d(rows, selected, assume_unique=True)
+        return rows
+
+    def _scores_for(self, query: str, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Scores of the given rows (of every chunk when rows is None), aligned with rows."""
+        if rows is None:
+            return self.scores(query)
+        with self._score_lock:
+            cached = self._score_cache.get(query)
+        if cached is not None:
+            return cached[rows]
+        if len(rows) > _SUBSET_SCORING_MAX_SHARE * len(self.documents):
+            # Large subsets (domain views) share the memoized full pass
+            return self.scores(query)[rows]
+        if self.hybrid:
+            return self._hybrid_scores(query, rows)
+        return self._lexical_scores(query, rows=rows)
+
+    def scores(self, query: str) -> np.ndarray:
+        """
+        Score every chunk against a query with the active backend
+
+        The last few score vectors are memoized per query text.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Array with one score per chunk (cosine for tfidf, BM25 for bm25,
+            fused reciprocal ranks for hybrid stores)
+        """
+        with self._score_lock:
+            cached = self._score_cache.get(query)
+            if cached is not None:
+                self._score_cache.move_to_end(query)
+                return cached
+        if self.hybrid:
+            scores = self._hybrid_scores(query)
+        else:
+            scores = self._lexical_scores(query)
+        with self._score_lock:
+            self._score_cache[query] = scores
+            while len(self._score_cache) > _SCORE_CACHE_SIZE:
+                self._score_cache.popitem(last=False)
+        return scores
+
+    def _lexical_scores(
+        self,
+        query: str,
+        query_vector: Optional[sparse.spmatrix] = None,
+        rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        if self.backend == "bm25":
+            # Postings already limit the work to the query terms
+            scores = self._bm25.scores(query)
+            return scores if rows is None else scores[rows]
+        if query_vector is None:
+            if self._query_encoder is not None:
+                return self._query_encoder.scores(query, rows)
+            query_vector = self._tfidf.transform([query])
+        matrix = self._matrix if rows is None else self._matrix[rows]
+        # CSR matrix times a dense vector is one pass over the stored values;
+        # q @ Mᵀ would transpose the whole matrix on every query
+        return matrix @ query_vector.toarray().ravel()
+
+    def _query_vector(self, query: str) -> sparse.csr_matrix:
+        if self._query_encoder is not None:
+            return self._query_encoder.transform(query)
+        return self._tfidf.transform([query])
+
+    def _hybrid_scores(self, query: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        if not self._lsa.n_dims:
+            # Too few chunks for a dense leg: rank by the lexical leg alone
+            return reciprocal_rank_fusion([self._lexical_scores(query, rows=rows)], c=Config.RRF_K)
+        query_vector = self._query_vector(query)
+        # The compiled encoder scores the lexical leg from its own postings
+        lexical_vector = None if self._query_encoder is not None else query_vector
+        # Pool threads score both legs themselves: waiting on the pool from
+        # inside it could deadlock once every worker does so
+        if rows is None and len(self.documents) >= _PARALLEL_LEGS_MIN_ROWS and not _in_retrieval_pool():
+            dense = _get_retrieval_pool().submit(self._lsa.scores, query_vector)
+            lexical = self._lexical_scores(query, lexical_vector)
+            dense = dense.result()
+        else:
+            lexical = self._lexical_scores(query, lexical_vector, rows)
+            dense = self._lsa.scores(query_vector, rows)
+        return reciprocal_rank_fusion([lexical, dense], c=Config.RRF_K)
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        domains: Optional[Iterable[str]] = None,
+        search_type: str = "similarity",
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        merge_adjacent: bool = False,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        """
+        Top-k chunks for a query, optionally restricted to some domains
+
+        Rows excluded by domains or filter are never scored when they make
+        up most of the store.
+
+        Args:
+            query: Query text
+            k: Number of documents
+            domains: Chunk ``domain`` values to keep (None = all chunks)
+            search_type: "similarity" (best scores) or "mmr" (maximal
+                marginal relevance over the fetch_k best chunks)
+            fetch_k: MMR candidate pool size
+            lambda_mult: MMR trade-off between relevance (1.0) and
+                diversity (0.0)
+            merge_adjacent: Merge overlapping chunks of the same file into
+                one span (may return fewer than k documents)
+            filter: Metadata filter, e.g. {"source": {"$in": [...]}} or
+                {"page": {"$gte": 2, "$lte": 5}} (see MetadataIndex)
+
+        Returns:
+            Up to k documents, best first
+        """
+        if search_type not in SEARCH_TYPES:
+            raise ValueError(f"Unsupported search type: {search_type}")
+        rows = self._select_rows(domains, filter)
+        scores = self._scores_for(query, rows)
+        if search_type == "mmr":
+            ids = self._mmr(scores, rows, k, max(fetch_k, k), lambda_mult)
+        else:
+            ids = _top_k(scores, k)
+            if rows is not None:
+                ids = rows[ids]
+        chunks = [self.documents[i] for i in ids]
+        if merge_adjacent:
+            chunks = merge_adjacent_chunks(chunks)
+        return [as_document(chunk) for chunk in chunks]
+
+    def _mmr(
+        self,
+        scores: np.ndarray,
+        rows: Optional[np.ndarray],
+        k: int,
+        fetch_k: int,
+        lambda_mult: float
+    ) -> np.ndarray:
+        """
+        Greedy maximal-marginal-relevance selection among the fetch_k best rows
+
+        Pairwise similarities of the candidates come from one sparse product
+        of their (L2-normalized) TF-IDF rows; each step then only updates the
+        candidates' maximum similarity to the picks so far. ``scores`` is
+        aligned with ``rows`` (every chunk when rows is None).
+        """
+        local = _top_k(scores, fetch_k)
+        candidates = local if rows is None else rows[local]
+        if not len(candidates):
+            return candidates
+        relevance = scores[local].astype(np.float64)
+        if relevance.max() > 0:
+            # Backends score on different scales (BM25, fused ranks)
+            relevance /= relevance.max()
+        vectors = self._matrix[candidates]
+        similarity = (vectors @ vectors.T).toarray()
+        redundancy = np.zeros(len(candidates))
+        available = np.ones(len(candidates), dtype=bool)
+        picked = []
+        for _ in range(min(k, len(candidates))):
+            gain = np.where(available, lambda_mult * relevance - (1 - lambda_mult) * redundancy, -np.inf)
+            best = int(np.argmax(gain))
+            picked.append(best)
+            available[best] = False
+            np.maximum(redundancy, similarity[best], out=redundancy)
+        return candidates[picked]
+
+    def view(self, domains: Iterable[str]) -> "DomainView":
+        """Return a store-like view restricted to chunks of the given domains."""
+        return DomainView(self, domains)
+
+    def stale_sources(self) -> Set[str]:
+        """Sources of memory-mapped chunks whose file changed since it was indexed."""
+        texts = {id(chunk.text): chunk for chunk in self.documents if isinstance(chunk.text, MappedText)}
+        return {chunk.source_metadata.get("source") for chunk in texts.values() if chunk.text.stale}
+
+    def _build_bm25(self) -> None:
+        self._bm25 = BM25Index().fit(chunk.page_content for chunk in self.documents)
+
+    def _fit_lsa(self) -> None:
+        if self._lsa is None:
+            self._lsa = LSAIndex(n_components=Config.LSA_COMPONENTS).fit(self._matrix)
+        elif self._lsa.vectors is None:
+            # Dropped by build_dense_index; the hybrid dense leg scores them all
+            self._lsa.vectors = self._lsa.project(self._matrix)
+
+    def build_dense_index(self, nprobe: Optional[int] = None) -> None:
+        """
+        Build the IVF index used by dense_search over the chunks' LSA vectors
+
+        The hash-based SimpleEmbeddings carry no similarity signal, so the
+        index uses the same latent vectors as the dense leg of hybrid ranking.
+        Stores too small for latent vectors get no index; dense_search then
+        falls back to search. A quantized index is the only dense copy kept
+        unless hybrid ranking needs the full-precision vectors: shortlists
+        are rescored from the candidates' TF-IDF rows instead.
+        """
+        self._fit_lsa()
+        self.dense_index = True
+        if not self._lsa.n_dims:
+            self._ivf = None
+            return
+        self._ivf = IVFIndex(
+            n_lists=Config.ANN_LISTS or None,
+            nprobe=nprobe or Config.ANN_NPROBE,
+            quantization=Config.ANN_QUANTIZATION
+        ).fit(self._lsa.vectors)
+        if self._ivf.quantization != "none" and not self.hybrid:
+            self._lsa.vectors = None
+
+    def set_dense_index(self, dense_index: bool) -> None:
+        """Build the IVF index (fitting the LSA vectors if needed) or drop it."""
+        if dense_index and self._ivf is None:
+            self.build_dense_index()
+        elif not dense_index:
+            self.dense_index, self._ivf = False, None
+            if not self.hybrid:
+                self._lsa = None
+
+    def _embed_rows(self, ids: np.ndarray) -> np.ndarray:
+        # Full-precision vectors for rescoring quantized candidates
+        if self._lsa.vectors is not None:
+            return self._lsa.vectors[ids]
+        return self._lsa.project(self._matrix[ids])
+
+    def dense_search(self, query: str, k: int = 5, nprobe: Optional[int] = None) -> List[Document]:
+        """
+        Approximate nearest-neighbour search over the chunks' LSA vectors
+
+        Args:
+            query: Query text
+            k: Number of documents
+            nprobe: IVF lists to scan (higher is slower but closer to exact)
+
+        Returns:
+            Up to k documents, most similar first
+        """
+        if self._ivf is None:
+            self.build_dense_index()
+        if self._ivf is None:
+            # Too few chunks for latent vectors
+            return self.search(query, k)
+        query_vector = self._lsa.transform(self._query_vector(query))
+        ids, _ = self._ivf.search(query_vector, k, nprobe=nprobe, rescore=self._embed_rows)
+        return [as_document(self.documents[i]) for i in ids[0] if i >= 0]
+
+    def set_backend(self, backend: str) -> None:
+        """Switch the retriever backend, building the BM25 index if needed."""
+        if backend not in RETRIEVER_BACKENDS:
+            raise ValueError(f"Unsupported retriever backend: {backend}")
+        self.backend = backend
+        if backend == "bm25" and self._bm25 is None:
+            self._build_bm25()
+        self._reset_caches()
+
+    def set_hybrid(self, hybrid: bool) -> None:
+        """Turn hybrid ranking on (fitting the LSA vectors if needed) or off."""
+        self.hybrid = hybrid
+        if hybrid:
+            self._fit_lsa()
+        elif not self.dense_index:
+            self._lsa = None
+        elif self._ivf is not None and self._ivf.quantization != "none":
+            # Only the quantized index needs them now (see build_dense_index)
+            self._lsa.vectors = None
+        self._reset_caches()
+
+    def patch(
+        self,
+        sources: List[str],
+        new_documents: Iterable[Document],
+        manifest: Dict[str, Dict],
+        deduplicator: Optional[MinHashDeduplicator] = None
+    ) -> "SimpleVectorStore":
+        """
+        Return a copy of the store with the chunks of some source files replaced
+
+        Chunk texts of untouched files are reused from memory, so only the
+        changed files have to be re-read and re-chunked by the caller. This
+        store is left as is, so retrievers already handed out keep working on
+        a consistent index while the new one is fitted.
+
+        Args:
+            sources: Source paths whose existing chunks are dropped
+                (changed and deleted files)
+            new_documents: Fresh chunks for changed and added files
+            manifest: Manifest describing the patched file set
+            deduplicator: Optional near-duplicate filter; new chunks are
+                compared against the chunks that are kept
+
+        Returns:
+            Patched SimpleVectorStore
+        """
+        removed = set(sources)
+        keep = np.fromiter(
+            (d.source_metadata.get("source") not in removed for d in self.documents),
+            dtype=bool, count=len(self.documents),
+        )
+        # Kept chunks are copied before their provenance changes: this store
+        # may still be serving them
+        documents = [d.copy() for d, kept in zip(self.documents, keep) if kept]
+        for chunk in documents:
+            if chunk.duplicates:
+                chunk.duplicates = [e for e in chunk.duplicates if e.get("source") not in removed] or None
+        new_documents = (_as_chunk(d) for d in new_documents)
+        if deduplicator is not None:
+            deduplicator.index(documents)
+            new_documents = deduplicator.deduplicate(new_documents)
+        patched = copy.copy(self)
+        patched.manifest = manifest
+        if self.vectorizer == "hashing" and documents:
+            # Hashed features need no refit: drop the removed rows and
+            # encode only the new chunks
+            added = list(new_documents)
+            patched._tfidf = self._tfidf.remove(keep).append(c.page_content for c in added)
+            patched._matrix = patched._tfidf.matrix
+            patched.documents = documents + added
+            patched._build_side_indexes()
+            return patched
+        documents.extend(new_documents)
+        if not documents:
+            print("Warning: No documents left after patch. Using empty placeholder.")
+            documents = [Document(page_content="No documents available", metadata={})]
+        patched._fit(documents)
+        return patched
 
-    def as_retriever(self, search_kwargs: Optional[dict] = None) -> TFIDFRetriever:
+    def add_documents(self, documents: Iterable[Document]) -> "SimpleVectorStore":
+        """
+        Return a copy of the store with extra chunks appended
+
+        With the hashing vectorizer only the new chunks are encoded; the
+        fitted TF-IDF vectorizer has to refit the whole corpus.
+        """
+        return self.patch([], documents, self.manifest)
+
+    @property
+    def cache_scope(self) -> Tuple[Optional[str], int]:
+        """Retrieval cache scope: results are only shared within one index version."""
+        return (self.collection_name, self.version)
+
+    def as_retriever(
+        self,
+        search_kwargs: Optional[dict] = None,
+        search_type: Optional[str] = None
+    ) -> BaseRetriever:
+        """
+        Args:
+            search_kwargs: "k" plus, for search, "fetch_k", "lambda_mult"
+                and "merge_adjacent" (defaults from Config)
+            search_type: "similarity" or "mmr" (default Config.RETRIEVAL_SEARCH_TYPE)
+        """
+        top_k = (search_kwargs or {}).get("k", 5)
+        options = _search_options(search_kwargs, search_type)
+        cached = {"cache": self.cache, "cache_scope": self.cache_scope}
+        if self.hybrid or options != _DEFAULT_SEARCH:
+            return SearchRetriever(
+                searcher=self, top_k=top_k, search_kwargs=options,
+                cache=self.cache, cache_scope=self.cache_scope + _options_scope(options)
+            )
+        if self.backend == "bm25":
+            return BM25Retriever(docs=self.documents, index=self._bm25, top_k=top_k, **cached)
+        return TFIDFRetriever(
+            docs=self.documents, tfidf=self._tfidf, matrix=self._matrix,
+            encoder=self._query_encoder, top_k=top_k, **cached
+        )
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def retrieve_batch(self, queries: List[str], k: int = 5) -> List[List[Document]]:
+        """Retrieve the top k documents for every query in one batched pass."""
+        return self.as_retriever(search_kwargs={"k": k}).retrieve_batch(queries)
+
+    def save(self, path: Path) -> str:
+        """
+        Write the fitted index and chunks to a snapshot file
+
+        Args:
+            path: Snapshot file path
+
+        Returns:
+            Checksum of the written snapshot
+        """
+        # Store each shared source text once plus per-chunk offsets
+        buffer_ids: Dict[tuple, int] = {}
+        buffers: List[str] = []
+        buffer_metadata: List[Dict] = []
+        chunk_buffer = np.empty(len(self.documents), dtype=np.int64)
+        chunk_bounds = np.full((len(self.documents), 2), -1, dtype=np.int64)
+        # Memory-mapped files are referenced by path and re-mapped on load
+        mapped_buffers: Dict[str, Dict] = {}
+        for row, chunk in enumerate(self.documents):
+            key = (id(chunk.text), id(chunk.source_metadata))
+            if key not in buffer_ids:
+                buffer_ids[key] = len(buffers)
+                if isinstance(chunk.text, MappedText):
+                    mapped_buffers[str(len(buffers))] = {
+                        "path": chunk.text.path,
+                        "size": chunk.text.size,
+                        "mtime_ns": chunk.text.mtime_ns,
+                    }
+                    buffers.append("")
+                else:
+                    buffers.append(chunk.text)
+                buffer_metadata.append(chunk.source_metadata)
+            chunk_buffer[row] = buffer_ids[key]
+            if chunk.chunk_start is not None:
+                chunk_bounds[row] = (chunk.chunk_start, chunk.chunk_end)
+        texts_buf, texts_offsets = pack_strings(buffers)
+        arrays = {
+            "texts_buf": texts_buf,
+            "texts_offsets": texts_offsets,
+            "chunk_buffer": chunk_buffer,
+            "chunk_bounds": chunk_bounds,
+        }
+        meta = {
+            "backend": self.backend,
+            "vectorizer": self.vectorizer,
+            "buffer_metadata": buffer_metadata,
+            "mapped_buffers": mapped_buffers,
+            "chunk_duplicates": {
+                str(row): chunk.duplicates
+                for row, chunk in enumerate(self.documents) if chunk.duplicates
+            },
+            "manifest": self.manifest,
+            "build_params": self.build_params,
+            "dense_index": self.dense_index,
+        }
+        if self.vectorizer == "hashing":
+            # The weighted matrix is rebuilt from the raw counts on load
+            hashing_arrays, meta["hashing"] = self._tfidf.to_state()
+            arrays.update(hashing_arrays)
+        else:
+            matrix = self._matrix.tocsr()
+            terms = sorted(self._tfidf.vocabulary_, key=self._tfidf.vocabulary_.get)
+            terms_buf, terms_offsets = pack_strings(terms)
+            arrays.update({
+                "matrix_data": matrix.data,
+                "matrix_indices": matrix.indices,
+                "matrix_indptr": matrix.indptr,
+                "matrix_shape": np.asarray(matrix.shape, dtype=np.int64),
+                "idf": self._tfidf.idf_,
+                "terms_buf": terms_buf,
+                "terms_offsets": terms_offsets,
+            })
+            meta["vectorizer_params"] = {
+                k: v for k, v in self._tfidf.get_params().items()
+                if isinstance(v, (str, int, float, bool, tuple, list, type(None)))
+            }
+        if self._bm25 is not None:
+            bm25_arrays, meta["bm25"] = self._bm25.to_state()
+            arrays.update(bm25_arrays)
+        if self._ivf is not None:
+            ivf_arrays, meta["ivf"] = self._ivf.to_state()
+            arrays.update(ivf_arrays)
+        if self._lsa is not None:
+            lsa_arrays, meta["lsa"] = self._lsa.to_state()
+            arrays.update(lsa_arrays)
+        meta["hybrid"] = self.hybrid
+        return write_snapshot(path, arrays, meta)
+
+    @classmethod
+    def load(cls, path: Path, embeddings: SimpleEmbeddings) -> "SimpleVectorStore":
+        """
+        Restore a store from a snapshot file without refitting
+
+        Args:
+            path: Snapshot file path
+            embeddings: Embeddings instance to attach
+
+        Returns:
+            SimpleVectorStore instance
+
+        Raises:
+            SnapshotError: If the snapshot is missing or invalid
+        """
+        arrays, meta = read_snapshot(path)
+        vectorizer = meta.get("vectorizer", "tfidf")
+        if vectorizer == "hashing":
+            tfidf = HashingTfidf.from_state(arrays, meta["hashing"])
+            matrix = tfidf.matrix
+        else:
+            params = dict(meta["vectorizer_params"])
+            params["ngram_range"] = tuple(params.get("ngram_range", (1, 1)))
+            tfidf = TfidfVectorizer(**params)
+            terms = unpack_strings(arrays["terms_buf"], arrays["terms_offsets"])
+            tfidf.vocabulary_ = {term: i for i, term in enumerate(terms)}
+            tfidf.idf_ = arrays["idf"]
+            matrix = sparse.csr_matrix(
+                (arrays["matrix_data"], arrays["matrix_indices"], arrays["matrix_indptr"]),
+                shape=tuple(arrays["matrix_shape"]),
+            )
+
+        texts = unpack_strings(arrays["texts_buf"], arrays["texts_offsets"])
+        buffer_metadata = meta["buffer_metadata"]
+        if len(texts) != len(buffer_metadata):
+            raise SnapshotError(f"Snapshot {path} has mismatched chunk texts and metadata")
+        for idx, info in meta.get("mapped_buffers", {}).items():
+            # A changed or unreadable file only makes its own chunks stale
+            # (their reads raise StaleTextError); refresh_vector_store re-reads
+            # it like any other changed file
+            mapped = MappedText(info["path"], info["size"], info["mtime_ns"])
+            if mapped.stale:
+                print(f"DEBUG: {info['path']} changed since snapshot {path}; its chunks are stale")
+            texts[int(idx)] = mapped
+
+        store = cls.__new__(cls)
+        store.documents = [
+            TextChunk(
+                texts[b],
+                buffer_metadata[b],
+                None if start < 0 else start,
+                None if start < 0 else end,
+            )
+            for b, (start, end) in zip(
+                arrays["chunk_buffer"].tolist(), arrays["chunk_bounds"].tolist()
+            )
+        ]
+        for row, duplicates in meta.get("chunk_duplicates", {}).items():
+            store.documents[int(row)].duplicates = duplicates
+        store.embeddings = embeddings
+        store.manifest = meta.get("manifest")
+        store.build_params = meta.get("build_params")
+        store.backend = meta.get("backend", "tfidf")
+        store._bm25 = BM25Index.from_state(arrays, meta["bm25"]) if "bm25" in meta else None
+        store._lsa = LSAIndex.from_state(arrays, meta["lsa"]) if "lsa" in meta else None
+        # Older snapshots indexed hash embeddings; their IVF index is dropped
+        # and rebuilt over the LSA vectors when dense_index is requested
+        has_ivf = "ivf" in meta and store._lsa is not None and "hybrid" in meta
+        store._ivf = IVFIndex.from_state(arrays, meta["ivf"]) if has_ivf else None
+        # Stores too small for latent vectors keep dense_index without an IVF
+        store.dense_index = store._ivf is not None or (
+            meta.get("dense_index", False) and store._lsa is not None and not store._lsa.n_dims
+        )
+        store.hybrid = meta.get("hybrid", store._lsa is not None)
+        store.vectorizer = vectorizer
+        store._tfidf = tfidf
+        store._matrix = matrix
+        store.collection_name = None
+        store.cache = None
+        store._query_encoder = QueryEncoder.compile(tfidf, matrix, Config.QUERY_POSTINGS)
+        store._index_metadata()
+        return store
+
+
+class SearchRetriever(CachedRetriever):
+    # Anything with search(query, k, **search_kwargs): a store or a DomainView
+    searcher: Any
+    search_kwargs: Dict[str, Any] = {}
+
+    def _search(self, query: str, k: int) -> List[Document]:
+        return self.searcher.search(query, k, **self.search_kwargs)
+
+
+class DomainView:
+    """
+    Domain-filtered view of a unified SimpleVectorStore
+
+    Exposes the store interface the agents use (as_retriever, len,
+    retrieve_batch) over the rows of some domains only. Views share the
+    store's vocabulary, matrix and memoized query scores.
+    """
+
+    def __init__(self, store: SimpleVectorStore, domains: Iterable[str]):
+        self.store = store
+        self.domains = tuple(sorted(domains))
+
+    def __len__(self) -> int:
+        return len(self.store._rows_for(self.domains))
+
+    def search(self, query: str, k: int = 5, **kwargs: Any) -> List[Document]:
+        return self.store.search(query, k, domains=self.domains, **kwargs)
+
+    def as_retriever(
+        self,
+        search_kwargs: Optional[dict] = None,
+        search_type: Optional[str] = None
+    ) -> SearchRetriever:
         top_k = (search_kwargs or {}).get("k", 5)
-        return TFIDFRetriever(docs=self.documents, tfidf=self._tfidf, matrix=self._matrix, top_k=top_k)
+        options = _search_options(search_kwargs, search_type)
+        return SearchRetriever(
+            searcher=self, top_k=top_k, search_kwargs=options, cache=self.store.cache,
+            cache_scope=self.store.cache_scope + (self.domains,) + _options_scope(options)
+        )
 
+    def retrieve_batch(self, queries: List[str], k: int = 5) -> List[List[Document]]:
+        return self.as_retriever(search_kwargs={"k": k}).retrieve_batch(queries)
 
 
 class VectorStoreManager:
     """Manages vector stores for different domains"""
     
-    def __init__(self, embedding_model: Optional[str] = None):
-        """Initialize vector store manager with simple embeddings"""
-        # Use simple hash-based embeddings (no dependencies)
-        self.embeddings = SimpleEmbeddings()
+    def __init__(
+        self,
+        embedding_model: Optional[str] = None,
+        dedup_threshold: Optional[float] = None,
+        retriever_backend: str = "tfidf",
+        vectorizer: str = "tfidf",
+        dense_index: bool = False,
+        vector_store_type: str = "tfidf",
+        embeddings: Optional[Any] = None,
+        cache: Optional[RetrievalCache] = None,
+        hybrid: bool = False,
+        shards: int = 0
+    ):
+        """
+        Initialize vector store manager with simple embeddings
+
+        Args:
+            embedding_model: Embedding model of the chroma/faiss stores
+                (default Config.EMBEDDING_MODEL; unused by the tfidf store)
+            dedup_threshold: Estimated Jaccard similarity above which chunks
+                built by refresh_vector_store are collapsed as near-duplicates
+                (None disables deduplication)
+            retriever_backend: "tfidf" or "bm25" (see SimpleVectorStore)
+            vectorizer: "tfidf" or "hashing" (see SimpleVectorStore)
+            dense_index: Keep an IVF index over LSA chunk vectors
+            vector_store_type: "tfidf" (in-memory SimpleVectorStore with
+                snapshots), "chroma" or "faiss" (persistent on-disk stores
+                from src.utils.vector_backends)
+            embeddings: Embeddings for the chroma/faiss stores (defaults to
+                build_embeddings(embedding_model); the hash-based
+                SimpleEmbeddings are rejected there)
+            cache: Retrieval result cache shared by the retrievers of all
+                in-memory collections (None disables caching)
+            hybrid: Fuse lexical and LSA rankings (see SimpleVectorStore)
+            shards: Split every collection across this many worker
+                processes (ShardedVectorStore, hashed TF-IDF only; 0 or 1 =
+                one in-process store). Sharded stores are rebuilt from the
+                documents instead of snapshotted and patched
+        """
+        if vector_store_type not in VECTOR_STORE_TYPES:
+            raise ValueError(f"Unsupported vector store type: {vector_store_type}")
+        if vector_store_type in PERSISTENT_STORES:
+            # Hash vectors carry no similarity signal: persistent stores rank
+            # by embeddings alone, so they need a real embedding model
+            if embeddings is None:
+                embeddings = build_embeddings(embedding_model)
+            elif isinstance(embeddings, SimpleEmbeddings):
+                raise ValueError(
+                    f"VECTOR_STORE_TYPE={vector_store_type} needs a real embedding model, not SimpleEmbeddings"
+                )
+        # The in-memory store ranks by TF-IDF; hash-based embeddings (no
+        # dependencies) only feed its optional IVF index
+        self.embeddings = embeddings or SimpleEmbeddings()
+        self.vector_store_type = vector_store_type
         self.vector_stores = {}
+        self.dedup_threshold = dedup_threshold
+        self.dedup_stats: Dict[str, Dict[str, int]] = {}
+        self.retriever_backend = retriever_backend
+        self.vectorizer = vectorizer
+        self.dense_index = dense_index
+        self.cache = cache
+        self.hybrid = hybrid
+        self.shards = shards if vector_store_type == "tfidf" else 0
+        if self.shards > 1 and (retriever_backend != "tfidf" or dense_index or hybrid):
+            print("Warning: Sharded stores rank by hashed TF-IDF only; bm25/dense/hybrid options are ignored")
+
+    def _register(self, collection_name: str, vectorstore: Any) -> None:
+        """Make a store the current version of a collection."""
+        previous = self.vector_stores.get(collection_name)
+        if not isinstance(vectorstore, PersistentVectorStore):
+            vectorstore.collection_name = collection_name
+            vectorstore.cache = self.cache
+        if self.cache is not None and previous is not None and previous is not vectorstore:
+            # Versioned keys already keep old results from being served;
+            # dropping them frees their slots right away
+            self.cache.invalidate(collection_name)
+        self.vector_stores[collection_name] = vectorstore
+
+    def build_params(self, document_loader: Any) -> Dict[str, Any]:
+        """
+        Settings that decide the chunks of a collection besides its files
+
+        Stored with every index built from a file manifest; an index built
+        with other settings is rebuilt instead of patched.
+
+        Args:
+            document_loader: DocumentLoader the chunks are read with
+
+        Returns:
+            JSON-serializable loader and dedup settings
+        """
+        return {
+            "loader": document_loader.chunking_params,
+            "dedup_threshold": self.dedup_threshold,
+        }
     
     def create_vector_store(
         self,
-        documents: List[Document],
+        documents: Iterable[Document],
         collection_name: str,
-        persist_directory: Optional[str] = None
+        persist_directory: Optional[str] = None,
+        manifest: Optional[Dict[str, Dict]] = None,
+        build_params: Optional[Dict[str, Any]] = None
     ) -> SimpleVectorStore:
-        """Create an in-memory TF-IDF vector store from documents"""
-        print(f"DEBUG: Creating vector store for {collection_name} with {len(documents)} documents")
-        vectorstore = SimpleVectorStore(documents=documents, embeddings=self.embeddings)
-        print(f"DEBUG: In-memory vector store ready: {collection_name}")
-        self.vector_stores[collection_name] = vectorstore
+        """Create a TF-IDF vector store from documents and snapshot it to disk"""
+        print(f"DEBUG: Creating vector store for {collection_name}")
+        if self.vector_store_type in PERSISTENT_STORES:
+            vectorstore = self._open_persistent(collection_name, persist_directory)
+            vectorstore.update(vectorstore.sources, documents, manifest, build_params)
+            print(f"DEBUG: {self.vector_store_type} vector store ready: {collection_name} with {len(vectorstore)} documents")
+            self._register(collection_name, vectorstore)
+            return vectorstore
+        if self.shards > 1:
+            from src.utils.sharded_store import ShardedVectorStore
+            vectorstore = ShardedVectorStore(
+                documents, self.shards, manifest=manifest, n_features=Config.HASHING_N_FEATURES,
+                build_params=build_params
+            )
+            print(
+                f"DEBUG: Sharded vector store ready: {collection_name} with {len(vectorstore)} "
+                f"documents in {self.shards} shards {vectorstore.shard_sizes}"
+            )
+            self._register(collection_name, vectorstore)
+            return vectorstore
+        vectorstore = SimpleVectorStore(
+            documents=documents, embeddings=self.embeddings, manifest=manifest,
+            backend=self.retriever_backend, vectorizer=self.vectorizer,
+            dense_index=self.dense_index, hybrid=self.hybrid, build_params=build_params
+        )
+        print(f"DEBUG: In-memory vector store ready: {collection_name} with {len(vectorstore.documents)} documents")
+        self._save_snapshot(vectorstore, collection_name, persist_directory)
+        self._register(collection_name, vectorstore)
         return vectorstore
+
+    def refresh_vector_store(
+        self,
+        collection_name: str,
+        directory_path: Union[str, Dict[str, str]],
+        document_loader: Any,
+        persist_directory: Optional[str] = None,
+        rebuild: bool = False
+    ) -> SimpleVectorStore:
+        """
+        Bring a collection up to date with its source directory
+
+        Only files whose content hash changed (or that were added or deleted)
+        since the existing snapshot are re-read and re-chunked. Falls back to a
+        full build when there is no snapshot with a manifest, or when the
+        snapshot was chunked or deduplicated with other settings (see
+        build_params).
+
+        Args:
+            collection_name: Name of the collection
+            directory_path: Directory containing the collection's documents,
+                or a mapping of domain name to directory for a unified
+                collection (each chunk's metadata gets its ``domain``)
+            document_loader: DocumentLoader used to read and chunk files
+            persist_directory: Directory where snapshots are persisted
+            rebuild: Discard the existing index and its manifest and
+                re-read every file
+
+        Returns:
+            Up-to-date VectorStore instance
+        """
+        deduplicator = (
+            MinHashDeduplicator(threshold=self.dedup_threshold)
+            if self.dedup_threshold is not None else None
+        )
+        directories = directory_path if isinstance(directory_path, dict) else {None: directory_path}
+        build_params = self.build_params(document_loader)
+        if self.vector_store_type in PERSISTENT_STORES:
+            return self._refresh_persistent(
+                collection_name, directories, document_loader, persist_directory, deduplicator,
+                build_params, rebuild
+            )
+        vectorstore = None
+        if not rebuild:
+            # Stores are tested against None: an empty store is falsy
+            vectorstore = self.vector_stores.get(collection_name)
+            if vectorstore is None:
+                vectorstore = self.load_vector_store(collection_name, persist_directory)
+        if vectorstore is not None and vectorstore.manifest is not None and vectorstore.build_params != build_params:
+            print(
+                f"DEBUG: Vector store {collection_name} was built with other chunking or dedup "
+                f"settings; it will be rebuilt"
+            )
+            vectorstore = None
+        if vectorstore is not None and vectorstore.manifest is not None and self.shards > 1:
+            # Shards are not patched in place: rebuild when anything changed
+            manifest, _ = self._build_manifest(directories, document_loader, vectorstore.manifest)
+            changed, deleted = document_loader.diff_manifest(vectorstore.manifest, manifest)
+            if not changed and not deleted:
+                print(f"DEBUG: Vector store {collection_name} is up to date")
+                return vectorstore
+            vectorstore = None
+        if vectorstore is None or vectorstore.manifest is None:
+            manifest, domain_of = self._build_manifest(directories, document_loader)
+            chunks = self._tag_domains(
+                chain.from_iterable(document_loader.stream_chunks(d) for d in directories.values()),
+                domain_of
+            )
+            vectorstore = self.create_vector_store(
+                documents=deduplicator.deduplicate(chunks) if deduplicator else chunks,
+                collection_name=collection_name,
+                persist_directory=persist_directory,
+                manifest=manifest,
+                build_params=build_params
+            )
+            self._report_dedup(collection_name, deduplicator)
+            return vectorstore
+
+        manifest, domain_of = self._build_manifest(directories, document_loader, vectorstore.manifest)
+        changed, deleted = document_loader.diff_manifest(vectorstore.manifest, manifest)
+        # A memory-mapped file rewritten with the same content hash still has
+        # to be re-read: its chunks' reads check the indexed size and mtime
+        changed += sorted((vectorstore.stale_sources() & set(manifest)) - set(changed))
+        if not changed and not deleted:
+            print(f"DEBUG: Vector store {collection_name} is up to date")
+            return vectorstore
+
+        # Files whose chunks were collapsed into a dropped chunk must be
+        # re-read too, otherwise their content would vanish from the index
+        affected = set(changed) | set(deleted)
+        collapsed = {
+            entry["source"]
+            for chunk in vectorstore.documents
+            if chunk.duplicates and chunk.source_metadata.get("source") in affected
+            for entry in chunk.duplicates
+        }
+        changed += sorted((collapsed - affected) & set(manifest))
+
+        print(
+            f"DEBUG: Patching {collection_name}: {len(changed)} changed/added, "
+            f"{len(deleted)} deleted files"
+        )
+        new_documents = self._tag_domains(document_loader.iter_chunks(
+            document_loader.iter_files([Path(source) for source in changed])
+        ), domain_of)
+        vectorstore = vectorstore.patch(changed + deleted, new_documents, manifest, deduplicator=deduplicator)
+        self._report_dedup(collection_name, deduplicator)
+        self._save_snapshot(vectorstore, collection_name, persist_directory)
+        self._register(collection_name, vectorstore)
+        return vectorstore
+
+    @staticmethod
+    def _build_manifest(
+        directories: Dict[Optional[str], str],
+        document_loader: Any,
+        previous: Optional[Dict[str, Dict]] = None
+    ) -> Tuple[Dict[str, Dict], Dict[str, Optional[str]]]:
+        """Merged manifest of several directories plus the domain of every source."""
+        manifest: Dict[str, Dict] = {}
+        domain_of: Dict[str, Optional[str]] = {}
+        for domain, directory in directories.items():
+            part = document_loader.build_manifest(directory, previous=previous)
+            manifest.update(part)
+            domain_of.update(dict.fromkeys(part, domain))
+        return manifest, domain_of
+
+    @staticmethod
+    def _tag_domains(chunks: Iterable[Any], domain_of: Dict[str, Optional[str]]) -> Iterator[Any]:
+        for chunk in chunks:
+            domain = domain_of.get(chunk.source_metadata.get("source"))
+            if domain is not None:
+                chunk.source_metadata["domain"] = domain
+            yield chunk
+
+    def _open_persistent(
+        self,
+        collection_name: str,
+        persist_directory: Optional[str] = None
+    ) -> PersistentVectorStore:
+        store_class = PERSISTENT_STORES[self.vector_store_type]
+        return store_class(
+            collection_name, persist_directory or Config.CHROMA_PERSIST_DIR, self.embeddings
+        )
+
+    def _refresh_persistent(
+        self,
+        collection_name: str,
+        directories: Dict[Optional[str], str],
+        document_loader: Any,
+        persist_directory: Optional[str],
+        deduplicator: Optional[MinHashDeduplicator],
+        build_params: Dict[str, Any],
+        rebuild: bool
+    ) -> PersistentVectorStore:
+        # Chunks live on disk, so near-duplicates are only collapsed among the
+        # chunks of the files being (re)indexed in this refresh
+        vectorstore = self.vector_stores.get(collection_name)
+        if vectorstore is None:
+            vectorstore = self._open_persistent(collection_name, persist_directory)
+        # Every stored chunk is replaced when the recorded manifest cannot be
+        # trusted to describe how the stored chunks were built
+        reindex = rebuild or vectorstore.manifest is None or vectorstore.build_params != build_params
+        manifest, domain_of = self._build_manifest(
+            directories, document_loader, None if reindex else vectorstore.manifest
+        )
+        if reindex:
+            changed, deleted = sorted(manifest), vectorstore.sources
+        else:
+            changed, deleted = document_loader.diff_manifest(vectorstore.manifest, manifest)
+        if not changed and not deleted:
+            print(f"DEBUG: Vector store {collection_name} is up to date")
+        else:
+            print(
+                f"DEBUG: Updating {self.vector_store_type} collection {collection_name}: "
+                f"{len(changed)} changed/added, {len(deleted)} deleted files"
+            )
+            new_documents = self._tag_domains(document_loader.iter_chunks(
+                document_loader.iter_files([Path(source) for source in changed])
+            ), domain_of)
+            if deduplicator is not None:
+                new_documents = deduplicator.deduplicate(new_documents)
+            vectorstore.update(list(changed) + list(deleted), new_documents, manifest, build_params)
+            self._report_dedup(collection_name, deduplicator)
+        self._register(collection_name, vectorstore)
+        return vectorstore
+
+    def _report_dedup(
+        self,
+        collection_name: str,
+        deduplicator: Optional[MinHashDeduplicator]
+    ) -> None:
+        if deduplicator is None:
+            return
+        stats = dict(deduplicator.stats)
+        self.dedup_stats[collection_name] = stats
+        share = stats["removed"] / stats["input"] * 100 if stats["input"] else 0.0
+        print(
+            f"DEBUG: Dedup {collection_name}: removed {stats['removed']} of "
+            f"{stats['input']} new chunks ({share:.1f}%)"
+        )
+
+    def _save_snapshot(
+        self,
+        vectorstore: SimpleVectorStore,
+        collection_name: str,
+        persist_directory: Optional[str] = None
+    ) -> None:
+        path = snapshot_path(persist_directory or Config.CHROMA_PERSIST_DIR, collection_name)
+        try:
+            vectorstore.save(path)
+            print(f"DEBUG: Saved index snapshot: {path}")
+        except OSError as e:
+            print(f"Warning: Could not write index snapshot {path}: {e}")
     
     def load_vector_store(
         self,
@@ -110,12 +2183,46 @@ class VectorStoreManager:
         Args:
             collection_name: Name of the collection
             persist_directory: Directory where vector store is persisted
+                (defaults to Config.CHROMA_PERSIST_DIR)
             
         Returns:
             VectorStore instance or None if not found
         """
-        # No persistence for simple in-memory store; always return None to rebuild
-        return None
+        if self.vector_store_type in PERSISTENT_STORES:
+            vectorstore = self._open_persistent(collection_name, persist_directory)
+            if vectorstore.manifest is None and not len(vectorstore):
+                return None
+            self._register(collection_name, vectorstore)
+            return vectorstore
+        if self.shards > 1:
+            # Shard processes are started from the documents, not snapshots
+            return None
+        path = snapshot_path(persist_directory or Config.CHROMA_PERSIST_DIR, collection_name)
+        if not path.exists():
+            return None
+        try:
+            vectorstore = SimpleVectorStore.load(path, embeddings=self.embeddings)
+        except SnapshotError as e:
+            print(f"Warning: Ignoring index snapshot for {collection_name}: {e}")
+            return None
+        if vectorstore.vectorizer != self.vectorizer:
+            print(
+                f"DEBUG: Snapshot for {collection_name} uses the {vectorstore.vectorizer} "
+                f"vectorizer, not {self.vectorizer}; it will be rebuilt"
+            )
+            return None
+        if (
+            vectorstore.backend != self.retriever_backend
+            or vectorstore.dense_index != self.dense_index
+            or vectorstore.hybrid != self.hybrid
+        ):
+            vectorstore.set_backend(self.retriever_backend)
+            if vectorstore.hybrid != self.hybrid:
+                vectorstore.set_hybrid(self.hybrid)
+            vectorstore.set_dense_index(self.dense_index)
+            self._save_snapshot(vectorstore, collection_name, persist_directory)
+        self._register(collection_name, vectorstore)
+        return vectorstore
     
     def get_vector_store(self, collection_name: str) -> Optional[SimpleVectorStore]:
         """
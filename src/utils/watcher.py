@@ -0,0 +1,93 @@
+"""Polling watcher that reports which document collections changed on disk.
+
+Uses ``os.scandir`` size/mtime signatures instead of a filesystem-event
+dependency so it behaves the same on every platform. A change is reported
+only after the directory has been stable for one polling interval, so
+files that are still being copied in are not indexed half-written.
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from src.utils.document_loader import SUPPORTED_EXTENSIONS
+
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+def directory_signature(directory_path: str) -> Signature:
+    """Return a sorted (path, size, mtime_ns) tuple for supported files under a directory."""
+    entries = []
+    stack = [directory_path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS:
+                        stat = entry.stat()
+                        entries.append((entry.path, stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            continue
+    return tuple(sorted(entries))
+
+
+class CollectionWatcher:
+    """Background thread that calls ``on_change(collection_name)`` when a directory changes"""
+
+    def __init__(
+        self,
+        directories: Dict[str, str],
+        on_change: Callable[[str], None],
+        interval: float = 5.0
+    ):
+        """
+        Args:
+            directories: Mapping of collection name to source directory
+            on_change: Callback run in the watcher thread for a changed collection
+            interval: Seconds between polls
+        """
+        self.directories = dict(directories)
+        self.on_change = on_change
+        self.interval = interval
+        self._signatures = {name: directory_signature(path) for name, path in self.directories.items()}
+        self._pending: Dict[str, Signature] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="collection-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def poll(self) -> None:
+        """Check every directory once (called by the thread; usable directly in tests/scripts)."""
+        for name, path in self.directories.items():
+            signature = directory_signature(path)
+            if signature == self._signatures[name]:
+                self._pending.pop(name, None)
+                continue
+            if self._pending.get(name) != signature:
+                # Changed since the last poll: wait one more interval for it to settle
+                self._pending[name] = signature
+                continue
+            self._pending.pop(name, None)
+            try:
+                self.on_change(name)
+                self._signatures[name] = signature
+            except Exception as e:  # keep watching; retried on the next poll
+                print(f"Warning: Reloading collection {name} failed: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll()
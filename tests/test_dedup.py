@@ -0,0 +1,36 @@
+"""
+Tests for near-duplicate chunk elimination
+"""
+
+from src.utils.dedup import MinHashDeduplicator
+from src.utils.document_loader import TextChunk
+
+BOILERPLATE = (
+    "This document is confidential and intended for internal use only. Contact the "
+    "policy owner with questions, and check the intranet for the latest version."
+)
+
+
+def _chunk(source: str, domain: str = None) -> TextChunk:
+    metadata = {"source": source}
+    if domain is not None:
+        metadata["domain"] = domain
+    return TextChunk(BOILERPLATE, metadata)
+
+
+def test_collapses_duplicates_within_a_domain():
+    deduplicator = MinHashDeduplicator()
+    kept = list(deduplicator.deduplicate([_chunk("a.txt", "hr_docs"), _chunk("b.txt", "hr_docs")]))
+
+    assert [c.source_metadata["source"] for c in kept] == ["a.txt"]
+    assert kept[0].duplicates == [{"source": "b.txt"}]
+    assert deduplicator.stats == {"input": 2, "kept": 1, "removed": 1}
+
+
+def test_keeps_duplicates_of_other_domains():
+    deduplicator = MinHashDeduplicator()
+    deduplicator.index([_chunk("hr.txt", "hr_docs")])
+    kept = list(deduplicator.deduplicate([_chunk("finance.txt", "finance_docs"), _chunk("hr2.txt", "hr_docs")]))
+
+    assert [c.source_metadata["source"] for c in kept] == ["finance.txt"]
+    assert deduplicator.stats["removed"] == 1
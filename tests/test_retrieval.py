@@ -0,0 +1,95 @@
+"""
+Tests for query encoding, metadata filters and the retrieval cache
+"""
+
+import numpy as np
+import pytest
+from langchain.schema import Document
+
+from src.utils.document_loader import DocumentLoader
+from src.utils.retrieval_cache import RetrievalCache
+from src.utils.vector_store import SimpleEmbeddings, SimpleVectorStore, VectorStoreManager
+
+from tests.test_vector_store import _data_chunks
+
+QUERIES = [
+    "How many vacation days do I get?",
+    "reset my PASSWORD",
+    "vpn vpn vpn connection",
+    "zebracorn",
+    "",
+]
+
+
+@pytest.mark.parametrize("vectorizer", ["tfidf", "hashing"])
+def test_query_encoder_matches_vectorizer(vectorizer):
+    store = SimpleVectorStore(_data_chunks(), SimpleEmbeddings(), vectorizer=vectorizer)
+    encoder = store._query_encoder
+    assert encoder is not None
+
+    for query in QUERIES:
+        expected = store._tfidf.transform([query])
+        assert np.allclose(encoder.transform(query).toarray(), expected.toarray())
+        assert np.allclose(encoder.scores(query), (store._matrix @ expected.T).toarray().ravel())
+        rows = np.array([0, 3, 5])
+        assert np.allclose(encoder.scores(query, rows=rows), encoder.scores(query)[rows])
+
+
+def _filter_store():
+    documents = [
+        Document(page_content=f"Section {page} of the travel policy covers per diem rates.",
+                 metadata={"source": source, "page": page})
+        for source in ("travel.pdf", "handbook.pdf") for page in range(1, 6)
+    ]
+    return SimpleVectorStore(documents, SimpleEmbeddings())
+
+
+def _pages(documents):
+    return sorted((doc.metadata["source"], doc.metadata["page"]) for doc in documents)
+
+
+def test_metadata_filters():
+    store = _filter_store()
+
+    def search(where):
+        return _pages(store.search("travel per diem", k=20, filter=where))
+
+    assert search({"source": "travel.pdf"}) == [("travel.pdf", page) for page in range(1, 6)]
+    assert search({"source": "travel.pdf", "page": {"$gte": 2, "$lt": 4}}) == [("travel.pdf", 2), ("travel.pdf", 3)]
+    assert search({"$or": [{"page": 1}, {"page": {"$gt": 4}}]}) == [
+        ("handbook.pdf", 1), ("handbook.pdf", 5), ("travel.pdf", 1), ("travel.pdf", 5)
+    ]
+    assert search({"source": {"$nin": ["travel.pdf"]}, "page": {"$ne": 3}}) == [
+        ("handbook.pdf", page) for page in (1, 2, 4, 5)
+    ]
+    assert search({"source": "missing.pdf"}) == []
+    with pytest.raises(ValueError):
+        search({"page": {"$like": 3}})
+
+
+def test_cache_serves_repeated_queries():
+    store = _filter_store()
+    store.cache = RetrievalCache()
+    retriever = store.as_retriever(search_kwargs={"k": 3})
+
+    first = retriever.invoke("per diem rates")
+    assert retriever.invoke("  Per diem RATES ") == first
+    assert store.cache.stats["hits"] == 1 and store.cache.stats["misses"] == 1
+
+
+def test_refresh_invalidates_cached_results(tmp_path):
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    (directory / "leave.txt").write_text("Employees accrue twenty vacation days per year.", encoding="utf-8")
+    cache = RetrievalCache()
+    manager = VectorStoreManager(cache=cache)
+    store = manager.refresh_vector_store("docs", str(directory), DocumentLoader(), str(tmp_path / "snapshots"))
+    assert store.as_retriever().invoke("zebracorn allowance") and len(cache) == 1
+
+    (directory / "zebracorn.txt").write_text("The zebracorn allowance is paid monthly.", encoding="utf-8")
+    patched = manager.refresh_vector_store("docs", str(directory), DocumentLoader(), str(tmp_path / "snapshots"))
+
+    assert patched.version != store.version
+    assert len(cache) == 0
+    top = patched.as_retriever(search_kwargs={"k": 1}).invoke("zebracorn allowance")
+    assert top[0].metadata["source"].endswith("zebracorn.txt")
@@ -0,0 +1,132 @@
+"""
+Tests for vector store snapshots and incremental refreshes
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.utils.document_loader import DocumentLoader
+from src.utils.index_snapshot import SnapshotError, read_snapshot, snapshot_path, write_snapshot
+from src.utils.vector_store import SimpleEmbeddings, SimpleVectorStore, VectorStoreManager
+
+TEXTS = {
+    "leave.txt": "Employees accrue twenty vacation days per year and may carry five over.",
+    "laptop.txt": "Reset your laptop password from the self-service portal or call the help desk.",
+    "expenses.txt": "Submit travel expenses with receipts within thirty days of the trip.",
+}
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    for name, text in TEXTS.items():
+        (directory / name).write_text(text, encoding="utf-8")
+    return directory
+
+
+def _sources(documents):
+    return [os.path.basename(doc.metadata["source"]) for doc in documents]
+
+
+class _CountingLoader(DocumentLoader):
+    """DocumentLoader recording the files it re-reads"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.read = []
+
+    def iter_files(self, files):
+        files = list(files)
+        self.read.extend(os.path.basename(str(f)) for f in files)
+        return super().iter_files(files)
+
+
+def test_snapshot_round_trip(corpus, tmp_path):
+    loader = DocumentLoader()
+    store = SimpleVectorStore(
+        loader.stream_chunks(str(corpus)), SimpleEmbeddings(),
+        manifest=loader.build_manifest(str(corpus)), build_params={"loader": loader.chunking_params}
+    )
+    path = tmp_path / "store.snapshot.npz"
+    store.save(path)
+    loaded = SimpleVectorStore.load(path, SimpleEmbeddings())
+
+    assert loaded.manifest == store.manifest
+    assert loaded.build_params == store.build_params
+    for query in ("vacation days", "laptop password", "travel receipts"):
+        assert loaded.search(query, k=3) == store.search(query, k=3)
+        assert np.allclose(loaded.scores(query), store.scores(query))
+
+
+def test_corrupted_snapshot_is_rejected(tmp_path):
+    path = tmp_path / "store.snapshot.npz"
+    write_snapshot(path, {"values": np.arange(4096, dtype=np.int64)}, {"name": "test"})
+    arrays, meta = read_snapshot(path)
+    assert meta["name"] == "test" and arrays["values"].sum() == 4095 * 4096 // 2
+
+    raw = bytearray(path.read_bytes())
+    raw[len(raw) // 2] ^= 0xFF
+    path.write_bytes(bytes(raw))
+    with pytest.raises(SnapshotError):
+        read_snapshot(path)
+    with pytest.raises(SnapshotError):
+        read_snapshot(tmp_path / "missing.snapshot.npz")
+
+
+def test_diff_manifest(corpus):
+    loader = DocumentLoader()
+    previous = loader.build_manifest(str(corpus))
+    (corpus / "leave.txt").write_text(TEXTS["leave.txt"] + " Sick leave is separate.", encoding="utf-8")
+    (corpus / "expenses.txt").unlink()
+    (corpus / "benefits.txt").write_text("Dental and vision cover starts on day one.", encoding="utf-8")
+
+    changed, deleted = loader.diff_manifest(previous, loader.build_manifest(str(corpus), previous))
+
+    assert sorted(os.path.basename(s) for s in changed) == ["benefits.txt", "leave.txt"]
+    assert [os.path.basename(s) for s in deleted] == ["expenses.txt"]
+
+
+def test_refresh_patches_only_changed_files(corpus, tmp_path):
+    persist = str(tmp_path / "snapshots")
+    VectorStoreManager().refresh_vector_store("docs", str(corpus), DocumentLoader(), persist)
+    (corpus / "laptop.txt").write_text("Zebracorn laptops are replaced every three years.", encoding="utf-8")
+    (corpus / "expenses.txt").unlink()
+
+    loader = _CountingLoader()
+    store = VectorStoreManager().refresh_vector_store("docs", str(corpus), loader, persist)
+
+    assert loader.read == ["laptop.txt"]
+    assert sorted(_sources(store.documents)) == ["laptop.txt", "leave.txt"]
+    assert _sources(store.search("zebracorn", k=1)) == ["laptop.txt"]
+    assert snapshot_path(persist, "docs").exists()
+
+
+def test_refresh_rebuilds_when_chunking_changes(corpus, tmp_path):
+    persist = str(tmp_path / "snapshots")
+    VectorStoreManager().refresh_vector_store("docs", str(corpus), DocumentLoader(chunk_size=1000), persist)
+
+    loader = _CountingLoader(chunk_size=40, chunk_overlap=0)
+    store = VectorStoreManager().refresh_vector_store("docs", str(corpus), loader, persist)
+
+    assert store.build_params["loader"]["chunk_size"] == 40
+    assert len(store) > len(TEXTS)
+    assert sorted(loader.read) == sorted(TEXTS)
+
+
+def test_rewritten_mapped_file_is_patched(corpus, tmp_path):
+    persist = str(tmp_path / "snapshots")
+    VectorStoreManager().refresh_vector_store("docs", str(corpus), DocumentLoader(mmap_threshold=1), persist)
+    # Same content hash, new mtime: the mapped chunks' reads are stale
+    leave = corpus / "leave.txt"
+    stat = leave.stat()
+    os.utime(leave, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    loader = _CountingLoader(mmap_threshold=1)
+    store = VectorStoreManager().refresh_vector_store("docs", str(corpus), loader, persist)
+
+    assert loader.read == ["leave.txt"]
+    assert not store.stale_sources()
+    assert _sources(store.search("vacation days", k=1)) == ["leave.txt"]
@@ -0,0 +1,74 @@
+"""
+Tests for SimpleVectorStore ranking
+"""
+
+from pathlib import Path
+
+import pytest
+from langchain.schema import Document
+
+from src.config import Config
+from src.utils.document_loader import DocumentLoader
+from src.utils.vector_store import SimpleEmbeddings, SimpleVectorStore
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def _store(texts, **kwargs) -> SimpleVectorStore:
+    documents = [Document(page_content=text, metadata={"source": f"doc{i}.txt"}) for i, text in enumerate(texts)]
+    return SimpleVectorStore(documents, SimpleEmbeddings(), **kwargs)
+
+
+def _data_chunks():
+    loader = DocumentLoader()
+    return [chunk for name in ("hr_docs", "tech_docs") for chunk in loader.stream_chunks(str(DATA_DIR / name))]
+
+
+def test_hybrid_search_on_one_document_store():
+    # The placeholder store of a missing domain directory has a single chunk
+    store = _store(["No documents available"], hybrid=True)
+
+    assert store._lsa.n_dims == 0
+    assert [doc.page_content for doc in store.search("documents")] == ["No documents available"]
+    assert [doc.page_content for doc in store.as_retriever().invoke("documents")] == ["No documents available"]
+    assert store.scores("documents")[0] > 0
+
+
+def test_dense_search_on_one_document_store():
+    store = _store(["No documents available"], dense_index=True)
+
+    assert store._ivf is None and store.dense_index
+    assert [doc.page_content for doc in store.dense_search("documents")] == ["No documents available"]
+
+
+def test_quantized_dense_index_keeps_no_float_copy(monkeypatch):
+    chunks = _data_chunks()
+    queries = ["how many vacation days do I get", "reset my password"]
+    exact = SimpleVectorStore(chunks, SimpleEmbeddings(), dense_index=True)
+    monkeypatch.setattr(Config, "ANN_QUANTIZATION", "int8")
+    quantized = SimpleVectorStore(chunks, SimpleEmbeddings(), dense_index=True)
+
+    assert quantized._lsa.vectors is None
+    for query in queries:
+        assert quantized.dense_search(query) == exact.dense_search(query)
+    quantized.set_hybrid(True)
+    assert quantized._lsa.vectors.shape == exact._lsa.vectors.shape
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"backend": "bm25"},
+    {"vectorizer": "hashing"},
+    {"hybrid": True},
+    {"dense_index": True},
+])
+def test_small_stores_return_every_document(options, tmp_path):
+    texts = ["Vacation days accrue monthly.", "Reset a password at the help desk."]
+    store = _store(texts, **options)
+    store.save(tmp_path / "store.snapshot.npz")
+    loaded = SimpleVectorStore.load(tmp_path / "store.snapshot.npz", SimpleEmbeddings())
+
+    for candidate in (store, loaded):
+        assert sorted(doc.page_content for doc in candidate.search("vacation", k=10)) == sorted(texts)
+        assert candidate.search("vacation", k=1)[0].page_content == texts[0]
+        assert candidate.as_retriever(search_kwargs={"k": 10}).invoke("password")[0].page_content == texts[1]